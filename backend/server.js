@@ -1,6 +1,7 @@
 const express = require('express');
 const cors = require('cors');
 const mysql = require('mysql2/promise');
+const crypto = require('crypto');
 require('dotenv').config();
 
 const app = express();
@@ -15,16 +16,84 @@ const dbConfig = {
     host: process.env.DB_HOST || 'localhost',
     user: process.env.DB_USER || 'root',
     password: process.env.DB_PASSWORD || '',
-    database: process.env.DB_NAME || 'de_kinta_homestay'
+    database: process.env.DB_NAME || 'de_kinta_homestay',
+    // DATE columns as 'YYYY-MM-DD' strings; as Date objects they serialise to the
+    // previous day in UTC when the server runs ahead of UTC
+    dateStrings: ['DATE']
 };
 
 // Database connection pool
 const pool = mysql.createPool(dbConfig);
 
 // API Routes
-// 1. Get all bookings
+// Columns the admin table may sort by
+const SORTABLE_COLUMNS = ['id', 'nama_penuh', 'tarikh_check_in', 'tarikh_check_out', 'status', 'created_at', 'updated_at'];
+const MAX_PAGE_SIZE = 200;
+
+// Build WHERE clause and params for the paginated bookings query
+function bookingFilters({ status, from, to, q }) {
+    const clauses = [];
+    const params = [];
+
+    if (status) {
+        clauses.push('status = ?');
+        params.push(status);
+    }
+    // Stays overlapping the requested date range
+    if (from) {
+        clauses.push('tarikh_check_out > ?');
+        params.push(from);
+    }
+    if (to) {
+        clauses.push('tarikh_check_in <= ?');
+        params.push(to);
+    }
+    if (q) {
+        const like = `%${q}%`;
+        clauses.push('(nama_penuh LIKE ? OR nama_panggilan LIKE ? OR no_reference LIKE ? OR id = ?)');
+        params.push(like, like, like, q);
+    }
+
+    return {
+        where: clauses.length ? `WHERE ${clauses.join(' AND ')}` : '',
+        params
+    };
+}
+
+// 1. Get all bookings (or only those changed since ?updated_since=<ISO timestamp>,
+//    or one page of them when ?page is given)
 app.get('/api/bookings', async (req, res) => {
+    const { updated_since, page } = req.query;
+    
     try {
+        if (page !== undefined) {
+            const pageNumber = Math.max(parseInt(page, 10) || 1, 1);
+            const pageSize = Math.min(Math.max(parseInt(req.query.page_size, 10) || 25, 1), MAX_PAGE_SIZE);
+            const sort = SORTABLE_COLUMNS.includes(req.query.sort) ? req.query.sort : 'created_at';
+            const order = req.query.order === 'asc' ? 'ASC' : 'DESC';
+            const { where, params } = bookingFilters(req.query);
+
+            const [[{ total }]] = await pool.query(`SELECT COUNT(*) AS total FROM bookings ${where}`, params);
+            const [rows] = await pool.query(
+                `SELECT * FROM bookings ${where} ORDER BY ${sort} ${order}, id ${order} LIMIT ? OFFSET ?`,
+                [...params, pageSize, (pageNumber - 1) * pageSize]
+            );
+            return res.json({ rows, total, page: pageNumber, page_size: pageSize });
+        }
+
+        if (updated_since !== undefined) {
+            const since = new Date(updated_since);
+            if (isNaN(since.getTime())) {
+                return res.status(400).json({ error: 'updated_since tidak sah' });
+            }
+            // >= so rows touched within the same second are never missed; the client de-duplicates
+            const [rows] = await pool.query(
+                'SELECT * FROM bookings WHERE updated_at >= ? ORDER BY created_at DESC',
+                [since]
+            );
+            return res.json(rows);
+        }
+
         const [rows] = await pool.query('SELECT * FROM bookings ORDER BY created_at DESC');
         res.json(rows);
     } catch (error) {
@@ -33,22 +102,68 @@ app.get('/api/bookings', async (req, res) => {
 });
 
 // 2. Create new booking
+// Creation is serialised with a MySQL named lock so two concurrent requests for the
+// same nights cannot both pass the availability check. Re-sending the same booking
+// (same reference and dates, e.g. a client retry after a timeout) returns the
+// existing booking instead of inserting a duplicate.
+const BOOKING_LOCK = 'de_kinta_create_booking';
+const BOOKING_LOCK_TIMEOUT = 10;
+
 app.post('/api/bookings', async (req, res) => {
     const { nama_penuh, nama_panggilan, tarikh_check_in, tarikh_check_out, no_reference } = req.body;
+
+    // YYYY-MM-DD strings compare in date order; a reversed stay would hold no nights
+    if (!(tarikh_check_out > tarikh_check_in)) {
+        return res.status(400).json({ error: 'Tarikh Check-out mesti selepas tarikh Check-in' });
+    }
     
+    let connection;
+    let locked = false;
     try {
-        // Check if dates are available
-        const [blockedDates] = await pool.query(
-            'SELECT date_blocked FROM blocked_dates WHERE date_blocked BETWEEN ? AND ?',
+        connection = await pool.getConnection();
+        const [[{ acquired }]] = await connection.query(
+            'SELECT GET_LOCK(?, ?) AS acquired',
+            [BOOKING_LOCK, BOOKING_LOCK_TIMEOUT]
+        );
+        if (acquired !== 1) {
+            return res.status(503).json({ error: 'Server sibuk. Sila cuba lagi.' });
+        }
+        locked = true;
+
+        // Same booking sent again
+        const [existing] = await connection.query(
+            `SELECT id FROM bookings
+             WHERE no_reference = ? AND tarikh_check_in = ? AND tarikh_check_out = ? AND status <> 'cancelled'
+             LIMIT 1`,
+            [no_reference, tarikh_check_in, tarikh_check_out]
+        );
+        if (existing.length > 0) {
+            return res.status(200).json({
+                message: 'Tempahan telah diterima',
+                bookingId: existing[0].id,
+                duplicate: true
+            });
+        }
+
+        // Check if dates are available (nights are [check-in, check-out); the
+        // check-out day itself stays free, as in the overlap check below)
+        const [blockedDates] = await connection.query(
+            'SELECT date_blocked FROM blocked_dates WHERE date_blocked >= ? AND date_blocked < ?',
             [tarikh_check_in, tarikh_check_out]
         );
+        const [overlapping] = await connection.query(
+            `SELECT id FROM bookings
+             WHERE status IN ('pending', 'confirmed') AND tarikh_check_in < ? AND tarikh_check_out > ?
+             LIMIT 1`,
+            [tarikh_check_out, tarikh_check_in]
+        );
 
-        if (blockedDates.length > 0) {
+        if (blockedDates.length > 0 || overlapping.length > 0) {
             return res.status(400).json({ error: 'Tarikh yang dipilih telah ditempah' });
         }
 
         // Create booking
-        const [result] = await pool.query(
+        const [result] = await connection.query(
             'INSERT INTO bookings (nama_penuh, nama_panggilan, tarikh_check_in, tarikh_check_out, no_reference) VALUES (?, ?, ?, ?, ?)',
             [nama_penuh, nama_panggilan, tarikh_check_in, tarikh_check_out, no_reference]
         );
@@ -59,6 +174,13 @@ app.post('/api/bookings', async (req, res) => {
         });
     } catch (error) {
         res.status(500).json({ error: error.message });
+    } finally {
+        if (connection) {
+            if (locked) {
+                await connection.query('SELECT RELEASE_LOCK(?)', [BOOKING_LOCK]).catch(() => {});
+            }
+            connection.release();
+        }
     }
 });
 
@@ -72,13 +194,188 @@ app.get('/api/blocked-dates', async (req, res) => {
     }
 });
 
+// Cheap fingerprint of everything that affects availability. Changes whenever a
+// blocked date is added/removed or a booking is created or changes status or dates.
+// Hashes per-row state rather than MAX(updated_at), which only has one-second
+// precision and would miss two changes within the same second.
+async function availabilityRevision() {
+    const [[row]] = await pool.query(
+        `SELECT (SELECT COUNT(*) FROM blocked_dates) AS blocked_count,
+                (SELECT BIT_XOR(CRC32(date_blocked)) FROM blocked_dates) AS blocked_hash,
+                (SELECT COUNT(*) FROM bookings) AS booking_count,
+                (SELECT BIT_XOR(CRC32(CONCAT_WS(':', id, status, tarikh_check_in, tarikh_check_out)))
+                 FROM bookings) AS booking_hash`
+    );
+    const fingerprint = [
+        row.blocked_count,
+        row.blocked_hash,
+        row.booking_count,
+        row.booking_hash
+    ].join(':');
+    return crypto.createHash('sha1').update(fingerprint).digest('hex').slice(0, 16);
+}
+
+// Availability revision probe; clients poll this and refetch /occupancy only when it changes
+app.get('/api/availability/revision', async (req, res) => {
+    try {
+        const revision = await availabilityRevision();
+        // Lets clients send If-None-Match and get an empty 304 when nothing changed
+        res.set('ETag', `"${revision}"`);
+        res.set('Cache-Control', 'no-cache');
+        res.json({ revision });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// Occupancy for the guest calendar: blocked dates plus the date ranges of
+// bookings still holding their nights (no guest details)
+app.get('/api/occupancy', async (req, res) => {
+    try {
+        const [blocked] = await pool.query(
+            "SELECT DATE_FORMAT(date_blocked, '%Y-%m-%d') AS date_blocked FROM blocked_dates WHERE date_blocked >= CURDATE()"
+        );
+        const [bookings] = await pool.query(
+            `SELECT id,
+                    DATE_FORMAT(tarikh_check_in, '%Y-%m-%d') AS check_in,
+                    DATE_FORMAT(tarikh_check_out, '%Y-%m-%d') AS check_out,
+                    status
+             FROM bookings
+             WHERE status IN ('pending', 'confirmed') AND tarikh_check_out > CURDATE()
+               AND tarikh_check_out > tarikh_check_in`
+        );
+        res.json({
+            blockedDates: blocked.map(row => row.date_blocked),
+            bookings
+        });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// iCalendar feed of unavailable nights for channel managers (Airbnb, Booking.com).
+// Blocked dates and confirmed bookings are merged into runs of consecutive nights,
+// one VEVENT per run. The feed is rebuilt only when the availability revision
+// changes, and VEVENT text is reused for runs that did not change.
+const DAY_MS = 24 * 60 * 60 * 1000;
+const icsCache = { revision: null, body: null, events: new Map() };
+
+const toDay = (dateString) => Date.parse(`${dateString}T00:00:00Z`) / DAY_MS;
+const icsDate = (day) => new Date(day * DAY_MS).toISOString().slice(0, 10).replace(/-/g, '');
+const icsStamp = () => new Date().toISOString().replace(/[-:]/g, '').replace(/\.\d{3}/, '');
+
+async function unavailableRuns() {
+    const [blocked] = await pool.query(
+        'SELECT date_blocked FROM blocked_dates WHERE date_blocked >= CURDATE()'
+    );
+    const [bookings] = await pool.query(
+        "SELECT tarikh_check_in, tarikh_check_out FROM bookings WHERE status = 'confirmed' AND tarikh_check_out > CURDATE()"
+    );
+
+    const nights = new Set(blocked.map(row => toDay(row.date_blocked)));
+    for (const row of bookings) {
+        for (let day = toDay(row.tarikh_check_in); day < toDay(row.tarikh_check_out); day++) {
+            nights.add(day);
+        }
+    }
+
+    // Merge consecutive nights into [start, end) runs
+    const runs = [];
+    for (const day of [...nights].sort((a, b) => a - b)) {
+        const last = runs[runs.length - 1];
+        if (last && last[1] === day) {
+            last[1] = day + 1;
+        } else {
+            runs.push([day, day + 1]);
+        }
+    }
+    return runs;
+}
+
+function icsEvent([start, end]) {
+    return [
+        'BEGIN:VEVENT',
+        `UID:${icsDate(start)}-${icsDate(end)}@dekinta-homestay`,
+        `DTSTAMP:${icsStamp()}`,
+        `DTSTART;VALUE=DATE:${icsDate(start)}`,
+        `DTEND;VALUE=DATE:${icsDate(end)}`,
+        'SUMMARY:Tidak tersedia',
+        'TRANSP:OPAQUE',
+        'END:VEVENT'
+    ].join('\r\n');
+}
+
+app.get('/api/availability.ics', async (req, res) => {
+    try {
+        const revision = await availabilityRevision();
+
+        if (icsCache.revision !== revision) {
+            const events = new Map();
+            for (const run of await unavailableRuns()) {
+                const key = run.join(':');
+                events.set(key, icsCache.events.get(key) || icsEvent(run));
+            }
+            icsCache.events = events;
+            icsCache.body = [
+                'BEGIN:VCALENDAR',
+                'VERSION:2.0',
+                'PRODID:-//De Kinta Homestay//Availability//MS',
+                'CALSCALE:GREGORIAN',
+                'METHOD:PUBLISH',
+                'X-WR-CALNAME:De Kinta Homestay',
+                ...events.values(),
+                'END:VCALENDAR',
+                ''
+            ].join('\r\n');
+            icsCache.revision = revision;
+        }
+
+        // Pollers that send If-None-Match get an empty 304 until availability changes
+        res.set('ETag', `"${revision}"`);
+        res.set('Cache-Control', 'no-cache');
+        res.type('text/calendar').send(icsCache.body);
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
+// Bulk status change (for admin): { ids: [...], status } -> one result per id
+const BOOKING_STATUSES = ['pending', 'confirmed', 'cancelled'];
+const MAX_BATCH_SIZE = 500;
+
+app.post('/api/bookings/batch', async (req, res) => {
+    const { ids, status } = req.body;
+
+    if (!Array.isArray(ids) || ids.length === 0 || ids.length > MAX_BATCH_SIZE) {
+        return res.status(400).json({ error: `Senarai ID mesti antara 1 dan ${MAX_BATCH_SIZE}` });
+    }
+    if (!BOOKING_STATUSES.includes(status)) {
+        return res.status(400).json({ error: 'Status tidak sah' });
+    }
+    
+    try {
+        const [found] = await pool.query('SELECT id FROM bookings WHERE id IN (?)', [ids]);
+        const existing = new Set(found.map(row => row.id));
+        if (existing.size > 0) {
+            await pool.query('UPDATE bookings SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id IN (?)', [status, [...existing]]);
+        }
+        res.json({
+            results: ids.map(id => existing.has(Number(id))
+                ? { id, ok: true }
+                : { id, ok: false, error: 'Tempahan tidak dijumpai' })
+        });
+    } catch (error) {
+        res.status(500).json({ error: error.message });
+    }
+});
+
 // 4. Update booking status (for admin)
 app.put('/api/bookings/:id', async (req, res) => {
     const { id } = req.params;
     const { status } = req.body;
     
     try {
-        await pool.query('UPDATE bookings SET status = ? WHERE id = ?', [status, id]);
+        await pool.query('UPDATE bookings SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', [status, id]);
         res.json({ message: 'Status tempahan dikemaskini' });
     } catch (error) {
         res.status(500).json({ error: error.message });
@@ -90,7 +387,7 @@ app.delete('/api/bookings/:id', async (req, res) => {
     const { id } = req.params;
     
     try {
-        await pool.query('UPDATE bookings SET status = "cancelled" WHERE id = ?', [id]);
+        await pool.query('UPDATE bookings SET status = "cancelled", updated_at = CURRENT_TIMESTAMP WHERE id = ?', [id]);
         res.json({ message: 'Tempahan dibatalkan' });
     } catch (error) {
         res.status(500).json({ error: error.message });
@@ -1,10 +1,17 @@
 import streamlit as st
 import requests
-import pandas as pd
+import importlib
+import json
+import os
 from datetime import datetime
 
+from api_client import ApiError, get_client
+from metrics import ENABLED as METRICS_ENABLED, count, get_registry, load_snapshots, start_rerun, timed, to_prometheus
+from warmup import FAST_START, warm_up
+
+rerun = start_rerun("admin")
+
 # Configuration
-API_URL = "http://localhost:5000/api"
 ADMIN_PASSWORD = "admin123"  # In production, use environment variables
 
 # Page config
@@ -18,6 +25,16 @@ st.set_page_config(
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
 
+# pandas and the modules built on it are only needed once logged in,
+# so the login page does not wait for them
+DASHBOARD_MODULES = ["pandas", "analytics", "booking_pages", "booking_sync", "exports"]
+if st.session_state.authenticated:
+    import pandas as pd
+    from analytics import cached_booking_stats
+    from booking_pages import PAGE_SIZES, SORT_COLUMNS, PageQuery, get_prefetcher
+    from booking_sync import get_booking_store
+    from exports import EXPORT_FORMATS, export_bookings
+
 # Login form
 def login():
     with st.form("login_form"):
@@ -27,7 +44,8 @@ def login():
         if submitted:
             if password == ADMIN_PASSWORD:
                 st.session_state.authenticated = True
-                st.experimental_rerun()
+                rerun.finish()
+                st.rerun()
             else:
                 st.error("Password tidak sah")
 
@@ -35,83 +53,312 @@ def login():
 def admin_dashboard():
     st.title("🏠 De Kinta Homestay Admin Panel")
     
-    # Fetch bookings
+    # Fetch bookings (only rows changed since the last sync, unless forced)
+    client = get_client()
+    store = get_booking_store()
+    full_resync = st.sidebar.button("🔄 Segerak Semula Semua Tempahan")
     try:
-        response = requests.get(f"{API_URL}/bookings")
-        if response.status_code == 200:
-            bookings = response.json()
+        try:
+            df, revision = store.sync(client, full=full_resync)
+        except (ApiError, requests.RequestException):
+            df, revision = store.snapshot()
+            if df is not None:
+                st.warning("Tidak dapat mengemas kini data tempahan. Memaparkan data terakhir.")
+        if df is not None:
             
-            # Convert to DataFrame
-            df = pd.DataFrame(bookings)
-            df['created_at'] = pd.to_datetime(df['created_at'])
-            df['updated_at'] = pd.to_datetime(df['updated_at'])
-            
-            # Display statistics
+            # Display statistics (computed once per data revision)
+            count("cache_requests_total", cache="booking_stats")
+            stats = cached_booking_stats(revision, df)
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Jumlah Tempahan", len(df))
+                st.metric("Jumlah Tempahan", stats['total'])
             with col2:
-                pending = len(df[df['status'] == 'pending'])
-                st.metric("Tempahan Menunggu", pending)
+                st.metric("Tempahan Menunggu", stats['status_counts']['pending'])
             with col3:
-                confirmed = len(df[df['status'] == 'confirmed'])
-                st.metric("Tempahan Disahkan", confirmed)
+                st.metric("Tempahan Disahkan", stats['status_counts']['confirmed'])
+            
+            with st.expander("📊 Analitik Tempahan"):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Purata Tempoh Menginap", f"{stats['avg_stay']:.1f} malam")
+                with col2:
+                    st.metric("Purata Tempahan Awal", f"{stats['avg_lead_time']:.0f} hari")
+                with col3:
+                    st.metric("Kadar Pembatalan", f"{stats['cancellation_rate']:.0%}")
+                if stats['invalid_stays']:
+                    st.warning(
+                        f"{stats['invalid_stays']} tempahan mempunyai tarikh check-in/check-out tidak sah "
+                        "dan tidak dikira dalam tempoh menginap atau kadar penghunian"
+                    )
+                if not stats['monthly_occupancy'].empty:
+                    st.caption("Kadar penghunian bulanan (tempahan disahkan)")
+                    occupancy = stats['monthly_occupancy'].rename("Kadar Penghunian")
+                    st.bar_chart(occupancy.set_axis(occupancy.index.strftime('%Y-%m')))
             
-            # Bookings table
+            # Bookings table (filtered, sorted and paged by the API)
             st.subheader("Senarai Tempahan")
             
             # Add filters
-            status_filter = st.selectbox(
-                "Tapis mengikut status",
-                ["Semua", "pending", "confirmed", "cancelled"]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                status_filter = st.selectbox(
+                    "Tapis mengikut status",
+                    ["Semua", "pending", "confirmed", "cancelled"]
+                )
+            with col2:
+                date_range = st.date_input("Julat tarikh penginapan", value=(), format="DD/MM/YYYY")
+            with col3:
+                search = st.text_input("Cari nama / no. rujukan")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                sort = st.selectbox("Susun mengikut", list(SORT_COLUMNS), format_func=SORT_COLUMNS.get)
+            with col2:
+                order = st.radio(
+                    "Tertib", ["desc", "asc"],
+                    format_func={"desc": "Menurun", "asc": "Menaik"}.get,
+                    horizontal=True
+                )
+            with col3:
+                page_size = st.selectbox("Saiz halaman", PAGE_SIZES)
+            
+            query = PageQuery(
+                status=None if status_filter == "Semua" else status_filter,
+                date_from=date_range[0].isoformat() if len(date_range) > 0 else None,
+                date_to=date_range[1].isoformat() if len(date_range) > 1 else None,
+                q=search.strip() or None,
+                sort=sort,
+                order=order,
+                page_size=page_size
             )
             
-            if status_filter != "Semua":
-                df = df[df['status'] == status_filter]
+            # Go back to the first page whenever the filters change
+            if st.session_state.get('booking_query') != query:
+                st.session_state.booking_query = query
+                st.session_state.booking_page = 1
+            
+            prefetcher = get_prefetcher()
+            page = prefetcher.get(query.at_page(st.session_state.booking_page), revision)
+            if st.session_state.booking_page > page.page_count:
+                st.session_state.booking_page = page.page_count
+                page = prefetcher.get(query.at_page(page.page_count), revision)
             
             # Display table
-            st.dataframe(df[[
-                'nama_penuh', 'nama_panggilan', 'tarikh_check_in',
-                'tarikh_check_out', 'no_reference', 'status', 'created_at'
-            ]])
+            with timed("render_seconds", section="bookings_table"):
+                st.dataframe(
+                    page.df[[
+                        'nama_penuh', 'nama_panggilan', 'tarikh_check_in',
+                        'tarikh_check_out', 'no_reference', 'status', 'created_at'
+                    ]],
+                    column_config={
+                        'tarikh_check_in': st.column_config.DateColumn(format="DD/MM/YYYY"),
+                        'tarikh_check_out': st.column_config.DateColumn(format="DD/MM/YYYY"),
+                    }
+                )
+            
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                st.number_input("Halaman", min_value=1, max_value=page.page_count, key="booking_page")
+            with col2:
+                st.caption(f"Halaman {page.query.page} / {page.page_count} · {page.total} tempahan")
+            
+            # Export (streamed from the API page by page, with the filters above)
+            with st.expander("⬇️ Eksport Tempahan"):
+                export_format = st.radio("Format", list(EXPORT_FORMATS), format_func=str.upper, horizontal=True)
+                if st.button("Sediakan Fail Eksport"):
+                    with st.spinner("Mengeksport tempahan..."):
+                        export_file, rows = export_bookings(client, export_format, query)
+                    with export_file:
+                        mime, suffix = EXPORT_FORMATS[export_format]
+                        st.download_button(
+                            f"Muat Turun ({rows} tempahan)",
+                            export_file.read(),
+                            file_name=f"tempahan-de-kinta{suffix}",
+                            mime=mime,
+                            on_click="ignore"
+                        )
+                
+                st.markdown("**Suapan iCal untuk Airbnb / Booking.com**")
+                st.code(client.availability_ics_url(), language=None)
+                if st.button("Sediakan Fail iCal"):
+                    st.download_button(
+                        "Muat Turun Kalendar (.ics)",
+                        client.availability_ics(),
+                        file_name="de-kinta-homestay.ics",
+                        mime="text/calendar",
+                        on_click="ignore"
+                    )
+            
+            # Bulk actions on the current page
+            st.subheader("Tindakan Pukal")
+            bulk_results = st.session_state.pop('bulk_results', None)
+            if bulk_results:
+                failed = [r for r in bulk_results if not r['ok']]
+                st.success(f"{len(bulk_results) - len(failed)} tempahan dikemaskini")
+                if failed:
+                    st.error(f"{len(failed)} tempahan gagal dikemaskini")
+                    st.dataframe(pd.DataFrame(failed).set_index('id'))
+            
+            select_all = st.checkbox("Pilih semua tempahan di halaman ini")
+            selected_ids = st.multiselect(
+                "Pilih tempahan",
+                page.df.index.tolist(),
+                default=page.df.index.tolist() if select_all else None,
+                format_func=lambda i: f"#{i} — {page.df.at[i, 'nama_penuh']} ({page.df.at[i, 'status']})"
+            )
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                bulk_confirm = st.button("Sahkan Dipilih", disabled=not selected_ids)
+            with col2:
+                bulk_cancel = st.button("Batal Dipilih", disabled=not selected_ids)
+            
+            if bulk_confirm or bulk_cancel:
+                status = "confirmed" if bulk_confirm else "cancelled"
+                with st.spinner(f"Mengemaskini {len(selected_ids)} tempahan..."):
+                    results = client.update_booking_statuses(selected_ids, status)
+                # Show the change straight away, then refresh once from the server
+                store.apply_status([r['id'] for r in results if r['ok']], status)
+                st.session_state.bulk_results = results
+                rerun.finish()
+                st.rerun()
             
             # Booking management
             st.subheader("Urus Tempahan")
+            lookup = st.text_input("Cari tempahan (ID, nama atau no. rujukan)").strip()
+            if lookup:
+                matches = prefetcher.get(PageQuery(q=lookup, page_size=20), revision).df
+            else:
+                matches = page.df
+            
             booking_id = st.selectbox(
                 "Pilih ID Tempahan",
-                df['id'].tolist()
+                matches.index.tolist(),
+                format_func=lambda i: f"#{i} — {matches.at[i, 'nama_penuh']} ({matches.at[i, 'no_reference']})"
             )
             
             if booking_id:
-                booking = df[df['id'] == booking_id].iloc[0]
+                booking = matches.loc[booking_id]
                 
                 col1, col2 = st.columns(2)
                 with col1:
                     if booking['status'] != 'confirmed':
                         if st.button("Sahkan Tempahan", key=f"confirm_{booking_id}"):
-                            response = requests.put(
-                                f"{API_URL}/bookings/{booking_id}",
-                                json={"status": "confirmed"}
-                            )
-                            if response.status_code == 200:
-                                st.success("Tempahan disahkan!")
-                                st.experimental_rerun()
+                            client.update_booking_status(booking_id, "confirmed")
+                            st.success("Tempahan disahkan!")
+                            rerun.finish()
+                            st.rerun()
                 
                 with col2:
                     if booking['status'] != 'cancelled':
                         if st.button("Batal Tempahan", key=f"cancel_{booking_id}"):
-                            response = requests.delete(f"{API_URL}/bookings/{booking_id}")
-                            if response.status_code == 200:
-                                st.success("Tempahan dibatalkan!")
-                                st.experimental_rerun()
+                            client.cancel_booking(booking_id)
+                            st.success("Tempahan dibatalkan!")
+                            rerun.finish()
+                            st.rerun()
                 
         else:
             st.error("Tidak dapat memuat data tempahan")
     except Exception as e:
         st.error(f"Ralat: {str(e)}")
 
+# API connection statistics
+def api_stats():
+    stats = get_client().stats()
+    with st.sidebar.expander("📡 Statistik API"):
+        col1, col2 = st.columns(2)
+        col1.metric("Sambungan Baru", stats["connections_opened"])
+        col2.metric("Sambungan Diguna Semula", stats["connections_reused"])
+        if stats["endpoints"]:
+            st.dataframe(pd.DataFrame.from_dict(stats["endpoints"], orient="index").round(1))
+
+# Performance page (hidden; open with ?view=prestasi after logging in)
+def performance_page():
+    st.title("⏱️ Prestasi")
+    if not METRICS_ENABLED:
+        st.info("Instrumentasi tidak aktif. Tetapkan METRICS_ENABLED=1 dan mulakan semula aplikasi.")
+        return
+    
+    # This process, plus snapshots written by the other app processes
+    snapshots = [{"source": "admin", **get_registry().snapshot()}]
+    snapshots += [s for s in load_snapshots() if s["pid"] != os.getpid()]
+    
+    st.subheader("Latensi")
+    latencies = pd.DataFrame([
+        {
+            "sumber": s["source"],
+            "metrik": h["name"],
+            "label": ", ".join(f"{k}={v}" for k, v in h["labels"].items()),
+            "bilangan": h["count"],
+            **{p: h[p] * 1000 for p in ("p50", "p95", "p99")},
+        }
+        for s in snapshots for h in s["histograms"]
+    ])
+    if latencies.empty:
+        st.caption("Tiada data lagi.")
+    else:
+        st.dataframe(
+            latencies.sort_values("p95", ascending=False),
+            hide_index=True,
+            column_config={p: st.column_config.NumberColumn(f"{p} (ms)", format="%.1f") for p in ("p50", "p95", "p99")}
+        )
+    
+    st.subheader("Kadar Hit Cache")
+    caches = {}
+    for s in snapshots:
+        for c in s["counters"]:
+            if c["name"] in ("cache_requests_total", "cache_misses_total"):
+                caches.setdefault((s["source"], c["labels"]["cache"]), {})[c["name"]] = c["value"]
+    if caches:
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "sumber": source,
+                    "cache": cache,
+                    "panggilan": c.get("cache_requests_total", 0),
+                    "miss": c.get("cache_misses_total", 0),
+                    "kadar hit": 1 - c.get("cache_misses_total", 0) / c["cache_requests_total"]
+                    if c.get("cache_requests_total") else None,
+                }
+                for (source, cache), c in sorted(caches.items())
+            ]),
+            hide_index=True,
+            column_config={"kadar hit": st.column_config.ProgressColumn(min_value=0, max_value=1, format="percent")}
+        )
+    else:
+        st.caption("Tiada data lagi.")
+    
+    st.subheader("Rerun Paling Perlahan")
+    reruns = sorted((r for s in snapshots for r in s["slow_reruns"]), key=lambda r: r["seconds"], reverse=True)[:10]
+    if reruns:
+        st.dataframe(
+            pd.DataFrame([
+                {"skrip": r["script"], "masa": datetime.fromtimestamp(r["time"]), "tempoh (ms)": r["seconds"] * 1000}
+                for r in reruns
+            ]),
+            hide_index=True
+        )
+    else:
+        st.caption("Tiada data lagi.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Muat Turun Prometheus", to_prometheus(snapshots), "metrics.prom", "text/plain", on_click="ignore")
+    with col2:
+        st.download_button(
+            "Muat Turun JSON", json.dumps(snapshots, indent=2), "metrics.json", "application/json", on_click="ignore"
+        )
+
 # Main app logic
 if not st.session_state.authenticated:
+    if FAST_START:
+        # Import them in the background while the password is typed
+        warm_up("admin", lambda: [importlib.import_module(name) for name in DASHBOARD_MODULES])
     login()
+elif st.query_params.get("view") == "prestasi":
+    performance_page()
 else:
     admin_dashboard()
+    api_stats()
+
+rerun.finish()
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from metrics import count, instrument
+
+# Audit timestamps are UTC; lead time is counted in homestay-local days
+LOCAL_TZ = "Asia/Kuala_Lumpur"
+
+
+def _nights_per_month(check_in, stay):
+    """Occupied nights per calendar month for stays given as start day + length."""
+    total = int(stay.sum())
+    if total == 0:
+        return pd.Series(dtype="int64")
+    # Expand every stay to its nights in one shot: start repeated, plus 0..stay-1
+    starts = np.repeat(check_in.to_numpy(dtype="datetime64[D]"), stay)
+    offsets = np.arange(total) - np.repeat(np.cumsum(stay) - stay, stay)
+    months = (starts + offsets.astype("timedelta64[D]")).astype("datetime64[M]")
+    return pd.Series(months).value_counts().sort_index()
+
+
+@instrument("booking_stats_seconds")
+def booking_stats(df):
+    """Dashboard statistics from a typed booking frame (see ``booking_sync.to_frame``).
+
+    Status counts, average stay and lead time come from one grouped pass;
+    occupancy is counted from confirmed stays. Rows whose stay is missing or
+    not positive (the API does not reject them) are left out of the stay
+    figures and counted in ``invalid_stays``.
+    """
+    stay = (df['tarikh_check_out'] - df['tarikh_check_in']).dt.days
+    valid = (stay > 0).to_numpy()
+    stay = stay.where(valid)
+    booked_on = df['created_at'].dt.tz_convert(LOCAL_TZ).dt.tz_localize(None).dt.normalize()
+    lead = (df['tarikh_check_in'] - booked_on).dt.days
+
+    by_status = (
+        pd.DataFrame({'status': df['status'], 'stay': stay, 'lead': lead})
+        .groupby('status', observed=False)
+        .agg(
+            count=('stay', 'size'),
+            stays=('stay', 'count'), stay_sum=('stay', 'sum'),
+            leads=('lead', 'count'), lead_sum=('lead', 'sum'),
+        )
+    )
+    total = int(by_status['count'].sum())
+    active = by_status.drop(index='cancelled').sum()
+
+    confirmed = (df['status'] == 'confirmed').to_numpy() & valid
+    nights = _nights_per_month(df['tarikh_check_in'][confirmed], stay[confirmed].to_numpy(dtype='int64'))
+    days_in_month = pd.DatetimeIndex(nights.index).days_in_month
+    occupancy = pd.Series(nights.to_numpy() / days_in_month, index=pd.PeriodIndex(nights.index, freq='M'))
+
+    return {
+        'total': total,
+        'status_counts': by_status['count'].to_dict(),
+        'avg_stay': active['stay_sum'] / active['stays'] if active['stays'] else 0.0,
+        'avg_lead_time': active['lead_sum'] / active['leads'] if active['leads'] else 0.0,
+        'cancellation_rate': by_status.at['cancelled', 'count'] / total if total else 0.0,
+        'monthly_occupancy': occupancy,
+        'invalid_stays': int((~valid).sum()),
+    }
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_booking_stats(revision, _df):
+    # Keyed on the booking store revision; the frame itself is not hashed
+    count("cache_misses_total", cache="booking_stats")
+    return booking_stats(_df)
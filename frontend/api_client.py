@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+
+API_URL = os.environ.get("API_URL", "http://localhost:5000/api")
+POOL_SIZE = int(os.environ.get("API_POOL_SIZE", "10"))
+MAX_RETRIES = int(os.environ.get("API_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.environ.get("API_BACKOFF_FACTOR", "0.3"))
+
+# (connect, read) timeouts in seconds, per endpoint
+DEFAULT_TIMEOUT = (3, 10)
+TIMEOUTS = {
+    "occupancy": (3, 5),
+    "revision": (2, 2),
+    "ics": (3, 10),
+    "bookings": (3, 10),
+    "booking": (3, 10),
+    "batch": (3, 30),
+}
+
+# Bulk status changes are sent in chunks of this size, this many at a time
+BATCH_SIZE = int(os.environ.get("API_BATCH_SIZE", "100"))
+BATCH_WORKERS = int(os.environ.get("API_BATCH_WORKERS", "4"))
+
+# Only calls that are safe to repeat are retried; creating a booking is not
+RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+RETRY_STATUSES = (502, 503, 504)
+
+
+class ApiError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class ApiClient:
+    """Thin wrapper over a pooled ``requests.Session`` for the Express backend."""
+
+    def __init__(self, base_url=API_URL, pool_size=POOL_SIZE, max_retries=MAX_RETRIES,
+                 backoff_factor=BACKOFF_FACTOR, timeouts=None, registry=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = {**TIMEOUTS, **(timeouts or {})}
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        # Requests also run on worker threads, so hold the registry directly
+        self.registry = registry or metrics.Registry()
+        self._revision = (None, None)  # (etag, revision) of the last revision probe
+
+    def request(self, method, endpoint, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeouts.get(endpoint, DEFAULT_TIMEOUT))
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            failed = response.status_code >= 400
+            return response
+        finally:
+            self._record(endpoint, time.perf_counter() - start, failed)
+
+    def _record(self, endpoint, elapsed, failed):
+        with self._lock:
+            stats = self._endpoints.setdefault(
+                endpoint, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["calls"] += 1
+            stats["errors"] += int(failed)
+            stats["total_ms"] += elapsed * 1000
+            stats["max_ms"] = max(stats["max_ms"], elapsed * 1000)
+        if metrics.ENABLED:
+            self.registry.observe("api_request_seconds", elapsed, endpoint=endpoint)
+            if failed:
+                self.registry.inc("api_errors_total", endpoint=endpoint)
+
+    @staticmethod
+    def _decode(response, expected):
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        if response.status_code >= 400:
+            message = data.get("error") if isinstance(data, dict) else None
+            raise ApiError(response.status_code, message or f"Ralat server: {response.status_code}")
+        if not isinstance(data, expected):
+            raise ApiError(response.status_code, "Format respons tidak dijangka")
+        return data
+
+    def stats(self):
+        """Per-endpoint latency and connection reuse counters for this process."""
+        opened = served = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                served += pool.num_requests
+        with self._lock:
+            endpoints = {
+                name: {**stats, "avg_ms": stats["total_ms"] / stats["calls"]}
+                for name, stats in self._endpoints.items()
+            }
+        return {
+            "endpoints": endpoints,
+            "connections_opened": opened,
+            "connections_reused": max(served - opened, 0),
+        }
+
+    # Endpoints
+
+    def availability_revision(self):
+        """Current availability revision; a conditional GET, so unchanged revisions cost a 304."""
+        etag, revision = self._revision
+        headers = {"If-None-Match": etag} if etag else None
+        response = self.request("GET", "revision", "/availability/revision", headers=headers)
+        if response.status_code == 304:
+            return revision
+        revision = self._decode(response, dict)["revision"]
+        self._revision = (response.headers.get("ETag"), revision)
+        return revision
+
+    def availability_ics_url(self):
+        return f"{self.base_url}/availability.ics"
+
+    def availability_ics(self):
+        response = self.request("GET", "ics", "/availability.ics")
+        if response.status_code >= 400:
+            raise ApiError(response.status_code, f"Ralat server: {response.status_code}")
+        return response.text
+
+    def occupancy(self):
+        """Blocked dates plus ``{id, check_in, check_out, status}`` of holding bookings."""
+        data = self._decode(self.request("GET", "occupancy", "/occupancy"), dict)
+        return data.get("blockedDates", []), data.get("bookings", [])
+
+    def bookings(self, updated_since=None):
+        params = {"updated_since": updated_since} if updated_since else None
+        return self._decode(self.request("GET", "bookings", "/bookings", params=params), list)
+
+    def booking_page(self, params):
+        """One page of bookings: ``{"rows": [...], "total": n, "page": p, "page_size": s}``."""
+        return self._decode(self.request("GET", "bookings", "/bookings", params=params), dict)
+
+    def create_booking(self, booking_data):
+        return self._decode(self.request("POST", "bookings", "/bookings", json=booking_data), dict)
+
+    def update_booking_status(self, booking_id, status):
+        response = self.request("PUT", "booking", f"/bookings/{booking_id}", json={"status": status})
+        return self._decode(response, dict)
+
+    def cancel_booking(self, booking_id):
+        return self._decode(self.request("DELETE", "booking", f"/bookings/{booking_id}"), dict)
+
+    def update_booking_statuses(self, booking_ids, status):
+        """Set ``status`` on many bookings; returns one ``{"id", "ok", "error"}`` dict per id."""
+        booking_ids = [int(booking_id) for booking_id in booking_ids]
+        chunks = [booking_ids[i:i + BATCH_SIZE] for i in range(0, len(booking_ids), BATCH_SIZE)]
+
+        def send(chunk):
+            try:
+                response = self.request("POST", "batch", "/bookings/batch", json={"ids": chunk, "status": status})
+                return self._decode(response, dict)["results"]
+            except (ApiError, requests.RequestException) as e:
+                return [{"id": booking_id, "ok": False, "error": str(e)} for booking_id in chunk]
+
+        if not chunks:
+            return []
+        with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(chunks))) as executor:
+            return [result for results in executor.map(send, chunks) for result in results]
+
+
+@st.cache_resource(show_spinner=False)
+def get_client():
+    # One pooled session per server process, shared by every session
+    return ApiClient(registry=metrics.get_registry())
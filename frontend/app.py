@@ -1,10 +1,14 @@
 import streamlit as st
 import requests
+import calendar
 from datetime import datetime, timedelta, date
-import pandas as pd
-import os
 
-API_URL = os.environ.get("API_URL", "http://localhost:5000/api")
+from api_client import API_URL, ApiError, get_client
+from metrics import count, start_rerun, timed
+from submissions import DONE, get_submission_queue
+from warmup import FAST_START, warm_up
+
+rerun = start_rerun("app")
 
 # Page config
 st.set_page_config(
@@ -31,6 +35,17 @@ st.markdown("""
         margin-bottom: 1rem;
         border-left: 4px solid #ffc107;
     }
+    .availability-calendar {
+        width: 100%;
+        text-align: center;
+    }
+    .availability-calendar td, .availability-calendar th {
+        padding: 0.4rem;
+    }
+    .cal-free { background-color: #d4edda; }
+    .cal-pending { background-color: #fff3cd; }
+    .cal-booked { background-color: #f8d7da; color: #721c24; }
+    .cal-past { color: #aaa; }
     </style>
     """, unsafe_allow_html=True)
 
@@ -48,40 +63,107 @@ st.title("🏠 DE KINTA HOMESTAY")
 st.markdown("### 📍 Alamat:")
 st.markdown("[Klik untuk lihat lokasi di Google Maps](https://maps.app.goo.gl/aCcBEU6VgxuPjq4K8)")
 
-# Get blocked dates from API (with fallback for demo)
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_blocked_dates():
+# Probe the availability revision at most every few seconds per server process
+@st.cache_data(ttl=5, show_spinner=False)
+def get_availability_revision():
+    count("cache_misses_total", cache="availability_revision")
+    try:
+        return get_client().availability_revision()
+    except (ApiError, requests.RequestException):
+        return None
+
+# Get occupancy (blocked dates + pending/confirmed bookings) from API (with fallback for demo).
+# Keyed on the revision, so it is only refetched - once per process - when availability changed.
+# The ttl still bounds staleness when the revision probe is unavailable.
+@st.cache_resource(ttl=300, max_entries=2, show_spinner=False, validate=lambda occupancy: not occupancy.is_stale())
+def get_occupancy(revision):
+    # Imported here so numpy loads off the first paint (in the warm-up thread)
+    from occupancy import OccupancyCalendar
+    
+    count("cache_misses_total", cache="occupancy")
     try:
-        response = requests.get(f"{API_URL}/blocked-dates", timeout=5)
-        if response.status_code == 200:
-            dates_data = response.json()
-            # Handle different response formats
-            if isinstance(dates_data, list):
-                return [datetime.strptime(date_str, '%Y-%m-%d').date() for date_str in dates_data]
-            elif isinstance(dates_data, dict) and 'blockedDates' in dates_data:
-                return [datetime.strptime(date_str, '%Y-%m-%d').date() for date_str in dates_data['blockedDates']]
-        return []
+        blocked, bookings = get_client().occupancy()
+        return OccupancyCalendar.build(blocked, bookings)
+    except ApiError:
+        return OccupancyCalendar(date.today())
     except (requests.RequestException, requests.Timeout):
         # Return demo blocked dates if API is not available
         today = date.today()
-        return [
-            today + timedelta(days=5),
-            today + timedelta(days=6),
-            today + timedelta(days=12),
-        ]
+        return OccupancyCalendar.build([
+            (today + timedelta(days=5)).isoformat(),
+            (today + timedelta(days=6)).isoformat(),
+            (today + timedelta(days=12)).isoformat(),
+        ], [])
     except Exception:
-        return []
+        return OccupancyCalendar(date.today())
 
-# Get blocked dates
-blocked_dates = get_blocked_dates()
+# Month grid of free / booked nights
+def render_calendar(occupancy):
+    from occupancy import BLOCKED, CONFIRMED, FREE, PENDING
+    
+    today = date.today()
+    months = [(today.year + (today.month - 1 + i) // 12, (today.month - 1 + i) % 12 + 1) for i in range(12)]
+    year, month = st.selectbox(
+        "Bulan",
+        months,
+        format_func=lambda ym: date(ym[0], ym[1], 1).strftime('%B %Y')
+    )
+    states = occupancy.month_states(year, month)
+    css = {None: "cal-past", FREE: "cal-free", PENDING: "cal-pending", CONFIRMED: "cal-booked", BLOCKED: "cal-booked"}
+    
+    rows = []
+    for week in calendar.monthcalendar(year, month):
+        cells = "".join(
+            f'<td class="{css[states[day - 1]]}">{day}</td>' if day else "<td></td>"
+            for day in week
+        )
+        rows.append(f"<tr>{cells}</tr>")
+    header = "".join(f"<th>{name}</th>" for name in ["Isn", "Sel", "Rab", "Kha", "Jum", "Sab", "Ahd"])
+    st.markdown(
+        f'<table class="availability-calendar"><tr>{header}</tr>{"".join(rows)}</table>'
+        '<p><span class="cal-free">Kosong</span> <span class="cal-pending">Menunggu pengesahan</span> '
+        '<span class="cal-booked">Telah ditempah</span></p>',
+        unsafe_allow_html=True
+    )
+
+# Get occupied dates
+def load_availability():
+    count("cache_requests_total", cache="availability_revision")
+    count("cache_requests_total", cache="occupancy")
+    return get_occupancy(get_availability_revision())
+
+# On a cold process, open the HTTP pool and build the occupancy snapshot in the
+# background (once per process) and render the form while it loads
+warmup = warm_up("availability", load_availability) if FAST_START else None
+if warmup is None or warmup.ready.is_set():
+    occupancy = load_availability()
+    blocked_dates = occupancy.availability()
+else:
+    occupancy = blocked_dates = None
 
 # Show blocked dates info
-if blocked_dates:
-    blocked_dates_str = ", ".join([d.strftime('%d/%m/%Y') for d in blocked_dates[:3]])
+if occupancy is None:
+    @st.fragment(run_every=0.5)
+    def availability_status():
+        if warmup.ready.is_set():
+            rerun.finish()
+            st.rerun()
+        st.info("⏳ Memuatkan tarikh kekosongan...")
+    
+    availability_status()
+elif blocked_dates:
+    blocked_dates_str = ", ".join([d.strftime('%d/%m/%Y') for d in blocked_dates.dates(limit=3)])
     if len(blocked_dates) > 3:
         blocked_dates_str += f" dan {len(blocked_dates) - 3} lagi..."
     st.info(f"📅 Tarikh yang telah ditempah: {blocked_dates_str}")
 
+if occupancy is not None:
+    with st.expander("📆 Kalendar Kekosongan"), timed("render_seconds", section="calendar"):
+        render_calendar(occupancy)
+
+# Booking submitted earlier in this session, if any
+submission = get_submission_queue().get(st.session_state.get("submission_key"))
+
 # Booking form
 with st.form("booking_form"):
     # Personal details
@@ -99,7 +181,7 @@ with st.form("booking_form"):
         )
     
     # Check if check-in date is blocked
-    if check_in in blocked_dates:
+    if blocked_dates is not None and check_in in blocked_dates:
         st.error(f"⚠️ Tarikh {check_in.strftime('%d/%m/%Y')} sudah ditempah. Sila pilih tarikh lain.")
     
     with col2:
@@ -112,16 +194,15 @@ with st.form("booking_form"):
         )
     
     # Check for blocked dates in range
-    if check_in and check_out:
-        current_date = check_in
-        blocked_in_range = []
-        while current_date < check_out:
-            if current_date in blocked_dates:
-                blocked_in_range.append(current_date.strftime('%d/%m/%Y'))
-            current_date += timedelta(days=1)
+    if check_in and check_out and blocked_dates is not None:
+        with timed("validation_seconds", check="date_range"):
+            blocked_in_range = [d.strftime('%d/%m/%Y') for d in blocked_dates.conflicts(check_in, check_out)]
         
         if blocked_in_range:
             st.error(f"⚠️ Tarikh berikut dalam tempoh anda sudah ditempah: {', '.join(blocked_in_range)}")
+            nights = (check_out - check_in).days
+            next_free = blocked_dates.next_free_window(check_in, nights)
+            st.info(f"💡 Tarikh kosong terdekat untuk {nights} malam bermula {next_free.strftime('%d/%m/%Y')}")
     
     # Payment info
     st.markdown("### 💳 Maklumat Pembayaran")
@@ -136,8 +217,12 @@ with st.form("booking_form"):
     
     no_reference = st.text_input("No. Reference Resit *", placeholder="Masukkan nombor rujukan pembayaran")
     
-    # Submit button
-    submitted = st.form_submit_button("📤 Hantar Tempahan", use_container_width=True)
+    # Submit button (disabled while a submission from this session is in flight)
+    submitted = st.form_submit_button(
+        "📤 Hantar Tempahan",
+        use_container_width=True,
+        disabled=submission is not None and not submission.finished
+    )
     
     if submitted:
         # Validation
@@ -156,15 +241,14 @@ with st.form("booking_form"):
         if check_in and check_out and check_out <= check_in:
             errors.append("Tarikh Check-out mesti selepas tarikh Check-in")
         
-        # Check for blocked dates
+        # Check for blocked dates (waiting for availability if it is still loading)
         if check_in and check_out:
-            current_date = check_in
-            blocked_found = False
-            while current_date < check_out and not blocked_found:
-                if current_date in blocked_dates:
-                    errors.append(f"Tarikh {current_date.strftime('%d/%m/%Y')} sudah ditempah")
-                    blocked_found = True
-                current_date += timedelta(days=1)
+            if blocked_dates is None:
+                occupancy = load_availability()
+                blocked_dates = occupancy.availability()
+            first_blocked = blocked_dates.first_conflict(check_in, check_out)
+            if first_blocked:
+                errors.append(f"Tarikh {first_blocked.strftime('%d/%m/%Y')} sudah ditempah")
         
         if errors:
             for error in errors:
@@ -179,46 +263,68 @@ with st.form("booking_form"):
                 "no_reference": no_reference.strip()
             }
             
-            with st.spinner("Menghantar tempahan..."):
-                try:
-                    response = requests.post(f"{API_URL}/bookings", json=booking_data, timeout=10)
-                    
-                    if response.status_code == 201:
-                        st.success("✅ Tempahan anda telah berjaya dihantar!")
-                        st.info("📱 Sila berikan No reference anda kepada nombor yang anda hubungi di WhatsApp")
-                        st.balloons()
-                        
-                        # Show booking summary
-                        with st.expander("📋 Ringkasan Tempahan"):
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.write("**Nama:**", nama_penuh)
-                                st.write("**Panggilan:**", nama_panggilan)
-                            with col2:
-                                st.write("**Check-in:**", check_in.strftime('%d/%m/%Y'))
-                                st.write("**Check-out:**", check_out.strftime('%d/%m/%Y'))
-                                duration = (check_out - check_in).days
-                                st.write("**Tempoh:**", f"{duration} hari")
-                        
-                        # Clear cache to refresh blocked dates
-                        st.cache_data.clear()
-                        
-                    elif response.status_code == 400:
-                        error_data = response.json()
-                        st.error(f"❌ {error_data.get('error', 'Data tidak sah')}")
-                    else:
-                        st.error(f"❌ Ralat server: {response.status_code}")
-                        
-                except requests.Timeout:
-                    st.error("❌ Masa tamat. Sila cuba lagi.")
-                except requests.ConnectionError:
-                    if API_URL == "http://localhost:5000/api":
-                        st.warning("⚠️ Demo Mode: Tempahan tidak dapat dihantar kerana backend belum disambungkan.")
-                        st.info("✅ Namun, form anda telah divalidasi dengan jayanya!")
-                    else:
-                        st.error("❌ Tidak dapat menyambung ke server. Sila cuba lagi.")
-                except Exception as e:
-                    st.error(f"❌ Ralat: {str(e)}")
+            # Queue the booking; it is posted in the background and its status shown below
+            submission = get_submission_queue().submit(booking_data)
+            st.session_state.submission_key = submission.key
+
+# Result of a finished submission
+def show_submission_result(submission):
+    booking_data = submission.booking_data
+    check_in = date.fromisoformat(booking_data["tarikh_check_in"])
+    check_out = date.fromisoformat(booking_data["tarikh_check_out"])
+    
+    if submission.status == DONE:
+        st.success("✅ Tempahan anda telah berjaya dihantar!")
+        st.info("📱 Sila berikan No reference anda kepada nombor yang anda hubungi di WhatsApp")
+        
+        if st.session_state.get("submission_seen") != submission.key:
+            st.session_state.submission_seen = submission.key
+            st.balloons()
+            # Hold the new booking's nights until the next revision brings a rebuilt calendar
+            if occupancy is not None:
+                occupancy.add_booking(submission.result["bookingId"], check_in, check_out, "pending")
+        
+        # Show booking summary
+        with st.expander("📋 Ringkasan Tempahan"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write("**Nama:**", booking_data["nama_penuh"])
+                st.write("**Panggilan:**", booking_data["nama_panggilan"])
+            with col2:
+                st.write("**Check-in:**", check_in.strftime('%d/%m/%Y'))
+                st.write("**Check-out:**", check_out.strftime('%d/%m/%Y'))
+                duration = (check_out - check_in).days
+                st.write("**Tempoh:**", f"{duration} hari")
+    
+    elif submission.error_type == "invalid":
+        st.error(f"❌ {submission.error}")
+    elif submission.error_type == "timeout":
+        st.error("❌ Masa tamat. Sila cuba lagi.")
+    elif submission.error_type == "connection":
+        if API_URL == "http://localhost:5000/api":
+            st.warning("⚠️ Demo Mode: Tempahan tidak dapat dihantar kerana backend belum disambungkan.")
+            st.info("✅ Namun, form anda telah divalidasi dengan jayanya!")
+        else:
+            st.error("❌ Tidak dapat menyambung ke server. Sila cuba lagi.")
+    else:
+        st.error(f"❌ Ralat: {submission.error}")
+
+# Poll the submission status in a fragment so the rest of the page is not rerun
+if submission is not None:
+    was_finished = submission.finished
+    
+    @st.fragment(run_every=None if was_finished else 1)
+    def submission_status():
+        if not submission.finished:
+            st.info(f"⏳ Menghantar tempahan... (cubaan {max(submission.attempts, 1)})")
+        elif not was_finished:
+            # Finished since the page last ran: rerun the whole page to re-enable the form
+            rerun.finish()
+            st.rerun()
+        else:
+            show_submission_result(submission)
+    
+    submission_status()
 
 # Footer
 st.markdown("---")
@@ -227,4 +333,6 @@ st.markdown("""
     <p>© 2024 DE KINTA HOMESTAY - Sistem Tempahan</p>
     <p>📱 Untuk pertanyaan lanjut, sila hubungi melalui WhatsApp</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+rerun.finish()
\ No newline at end of file
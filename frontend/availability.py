@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+EPOCH = date(1970, 1, 1)
+
+
+def to_day(d):
+    return (d - EPOCH).days
+
+
+def from_day(day):
+    return EPOCH + timedelta(days=int(day))
+
+
+def parse_days(values):
+    """Parse API date strings to day offsets in one pass, keeping order.
+
+    The backend may send plain ``YYYY-MM-DD`` strings or full ISO
+    timestamps, so everything is truncated to the date part first.
+    """
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.asarray(values, dtype="U10").astype("datetime64[D]").astype(np.int64)
+
+
+def parse_dates(values):
+    """Sorted, unique day offsets for a list of date strings."""
+    return np.unique(parse_days(values))
+
+
+class Availability:
+    """Blocked nights stored as a sorted day-offset array plus merged intervals.
+
+    A night is identified by its date; a stay from ``check_in`` to
+    ``check_out`` occupies the nights ``[check_in, check_out)``.
+    """
+
+    def __init__(self, days=None):
+        days = np.empty(0, dtype=np.int64) if days is None else np.asarray(days, dtype=np.int64)
+        self.days = days
+        if len(days):
+            breaks = np.flatnonzero(np.diff(days) != 1) + 1
+            self.starts = days[np.concatenate(([0], breaks))]
+            self.ends = days[np.concatenate((breaks - 1, [len(days) - 1]))] + 1
+        else:
+            self.starts = np.empty(0, dtype=np.int64)
+            self.ends = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_strings(cls, values):
+        return cls(parse_dates(values))
+
+    def __len__(self):
+        return len(self.days)
+
+    def __contains__(self, d):
+        day = to_day(d)
+        i = np.searchsorted(self.days, day)
+        return bool(i < len(self.days) and self.days[i] == day)
+
+    def dates(self, limit=None):
+        days = self.days if limit is None else self.days[:limit]
+        return [from_day(day) for day in days]
+
+    def _bounds(self, check_in, check_out):
+        return (
+            np.searchsorted(self.days, to_day(check_in), side="left"),
+            np.searchsorted(self.days, to_day(check_out), side="left"),
+        )
+
+    def is_free(self, check_in, check_out):
+        lo, hi = self._bounds(check_in, check_out)
+        return lo == hi
+
+    def conflicts(self, check_in, check_out):
+        lo, hi = self._bounds(check_in, check_out)
+        return [from_day(day) for day in self.days[lo:hi]]
+
+    def first_conflict(self, check_in, check_out):
+        lo, hi = self._bounds(check_in, check_out)
+        return from_day(self.days[lo]) if lo < hi else None
+
+    def next_free_window(self, start, nights):
+        """Return the earliest check-in date on or after ``start`` with ``nights`` free nights."""
+        day = to_day(start)
+        # Only intervals ending after ``start`` can get in the way
+        i = np.searchsorted(self.ends, day, side="right")
+        starts, ends = self.starts[i:], self.ends[i:]
+        if len(starts) == 0:
+            return start
+        gap_starts = np.concatenate(([day], np.maximum(ends, day)))
+        gap_ends = np.concatenate((starts, [np.iinfo(np.int64).max]))
+        fits = np.flatnonzero(gap_ends - gap_starts >= nights)
+        return from_day(gap_starts[fits[0]])
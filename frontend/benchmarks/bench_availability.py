@@ -0,0 +1,67 @@
+"""Micro-benchmark: list scans vs. the Availability index.
+
+Run from the ``frontend`` directory:
+
+    python benchmarks/bench_availability.py
+"""
+import os
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from availability import Availability  # noqa: E402
+
+START = date(2024, 1, 1)
+STAY_NIGHTS = 14
+REPEAT = 200
+
+
+def make_payload(size):
+    days = random.sample(range(size * 3), size)
+    return [(START + timedelta(days=d)).isoformat() for d in days]
+
+
+def old_parse(payload):
+    return [datetime.strptime(s, '%Y-%m-%d').date() for s in payload]
+
+
+def old_check(blocked, check_in, check_out):
+    current_date = check_in
+    found = []
+    while current_date < check_out:
+        if current_date in blocked:
+            found.append(current_date)
+        current_date += timedelta(days=1)
+    return found
+
+
+def bench(size):
+    payload = make_payload(size)
+    check_in = START + timedelta(days=size)
+    check_out = check_in + timedelta(days=STAY_NIGHTS)
+
+    blocked_list = old_parse(payload)
+    availability = Availability.from_strings(payload)
+    assert old_check(blocked_list, check_in, check_out) == availability.conflicts(check_in, check_out)
+
+    parse_old = timeit.timeit(lambda: old_parse(payload), number=5) / 5
+    parse_new = timeit.timeit(lambda: Availability.from_strings(payload), number=5) / 5
+    check_old = timeit.timeit(lambda: old_check(blocked_list, check_in, check_out), number=REPEAT) / REPEAT
+    check_new = timeit.timeit(lambda: availability.conflicts(check_in, check_out), number=REPEAT) / REPEAT
+    window_new = timeit.timeit(lambda: availability.next_free_window(START, STAY_NIGHTS), number=REPEAT) / REPEAT
+    return parse_old, parse_new, check_old, check_new, window_new
+
+
+def main():
+    random.seed(0)
+    print(f"{'blocked':>8} {'parse list':>12} {'parse idx':>12} {'scan list':>12} {'scan idx':>12} {'next free':>12}")
+    for size in (10, 100, 1_000, 10_000, 100_000):
+        row = bench(size)
+        print(f"{size:>8} " + " ".join(f"{t * 1e6:>10.1f}us" for t in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark: untyped booking frame + mask scans vs. typed frame + grouped stats.
+
+Run from the ``frontend`` directory:
+
+    python benchmarks/bench_booking_frame.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from analytics import booking_stats  # noqa: E402
+from booking_sync import to_frame  # noqa: E402
+
+STATUSES = ['pending', 'confirmed', 'cancelled']
+
+
+def make_bookings(count):
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    bookings = []
+    for i in range(count):
+        created = start + timedelta(minutes=17 * i)
+        check_in = created.date() + timedelta(days=random.randint(1, 90))
+        stamp = created.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        bookings.append({
+            'id': i + 1,
+            'nama_penuh': f"Tetamu Nombor {i}",
+            'nama_panggilan': f"T{i}",
+            'tarikh_check_in': check_in.isoformat(),
+            'tarikh_check_out': (check_in + timedelta(days=random.randint(1, 6))).isoformat(),
+            'no_reference': f"REF{i:08d}",
+            'status': random.choice(STATUSES),
+            'created_at': stamp,
+            'updated_at': stamp,
+        })
+    return bookings
+
+
+def old_approach(bookings):
+    df = pd.DataFrame(bookings)
+    df['created_at'] = pd.to_datetime(df['created_at'])
+    df['updated_at'] = pd.to_datetime(df['updated_at'])
+    stats = (len(df), len(df[df['status'] == 'pending']), len(df[df['status'] == 'confirmed']))
+    return df, stats
+
+
+def new_approach(bookings):
+    df = to_frame(bookings)
+    return df, booking_stats(df)
+
+
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def check_malformed_stays():
+    """Stats must survive stays the API lets through: reversed, empty or missing dates."""
+    bookings = make_bookings(10)
+    for booking in bookings:
+        booking['status'] = 'confirmed'
+    bookings[0]['tarikh_check_out'] = bookings[0]['tarikh_check_in']
+    bookings[1]['tarikh_check_in'], bookings[1]['tarikh_check_out'] = (
+        bookings[1]['tarikh_check_out'], bookings[1]['tarikh_check_in'])
+    bookings[2]['tarikh_check_out'] = None
+    stats = booking_stats(to_frame(bookings))
+    df = to_frame(bookings[3:])
+    expected = booking_stats(df)
+    assert stats['invalid_stays'] == 3, stats['invalid_stays']
+    assert stats['avg_stay'] == expected['avg_stay']
+    assert stats['monthly_occupancy'].equals(expected['monthly_occupancy'])
+
+
+def main():
+    random.seed(0)
+    check_malformed_stays()
+    print(f"{'bookings':>9} {'old MB':>8} {'new MB':>8} {'old load+3 counts':>18} {'new load+all stats':>19}")
+    for count in (10_000, 100_000):
+        bookings = make_bookings(count)
+        old_time, (old_df, old_stats) = timed(old_approach, bookings)
+        new_time, (new_df, new_stats) = timed(new_approach, bookings)
+        assert old_stats == (new_stats['total'], new_stats['status_counts']['pending'],
+                             new_stats['status_counts']['confirmed'])
+        old_mb = old_df.memory_usage(deep=True).sum() / 2**20
+        new_mb = new_df.memory_usage(deep=True).sum() / 2**20
+        print(f"{count:>9} {old_mb:>8.1f} {new_mb:>8.1f} {old_time * 1000:>16.1f}ms {new_time * 1000:>17.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark: cold start of ``app.py`` and ``admin.py`` in fresh processes.
+
+For each variant, new Python processes measure:
+
+* import time of the script's top-level imports (Streamlit itself excluded),
+* time to first render: the first ``AppTest`` run of a fresh process,
+* for the guest app, time until availability is shown,
+* for the admin app, the first dashboard render after a simulated login.
+
+Variants are this tree with ``FAST_START=0`` and ``=1``, plus an older
+revision when ``--baseline`` is given. Run from the ``frontend`` directory:
+
+    python benchmarks/bench_cold_start.py [--baseline HEAD~1] [--latency-ms 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+FRONTEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, FRONTEND)
+
+from stub_backend import StubBackend, sample_bookings  # noqa: E402
+
+IMPORTS = """
+import ast, json, sys, time
+import streamlit
+tree = ast.parse(open(sys.argv[1]).read())
+code = compile(ast.Module([n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))], []), "imports", "exec")
+start = time.perf_counter()
+exec(code, {})
+print(json.dumps({"import": time.perf_counter() - start}))
+"""
+
+RENDER = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+script, typing = sys.argv[1], float(sys.argv[2])
+result = {}
+at = AppTest.from_file(script, default_timeout=60)
+start = time.perf_counter()
+at.run()
+result["first_render"] = time.perf_counter() - start
+if script.endswith("app.py"):
+    while any(info.value.startswith("⏳ Memuatkan") for info in at.info):
+        time.sleep(0.05)
+        at.run()
+    result["ready"] = time.perf_counter() - start
+else:
+    time.sleep(typing)
+    at.session_state.authenticated = True
+    start = time.perf_counter()
+    at.run()
+    result["dashboard"] = time.perf_counter() - start
+assert not at.exception, at.exception
+print(json.dumps(result))
+"""
+
+
+def measure(directory, script, env, typing):
+    result = {}
+    for child in (IMPORTS, RENDER):
+        output = subprocess.run(
+            [sys.executable, "-c", child, script, str(typing)],
+            cwd=directory, env={**os.environ, "PYTHONPATH": directory, **env},
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result.update(json.loads(output.strip().splitlines()[-1]))
+    return result
+
+
+def checkout(revision, target):
+    archive = subprocess.run(
+        ["git", "archive", revision, "frontend"], cwd=os.path.dirname(FRONTEND), capture_output=True, check=True
+    )
+    subprocess.run(["tar", "-x", "-C", target], input=archive.stdout, check=True)
+    return os.path.join(target, "frontend")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", help="git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--latency-ms", type=float, default=200, help="backend latency per request")
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--typing", type=float, default=2, help="seconds between login page and login")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backend = StubBackend(latency=args.latency_ms / 1000).start()
+    backend.add_bookings(sample_bookings(args.bookings))
+    env = {"API_URL": backend.api_url}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = []
+        if args.baseline:
+            variants.append((args.baseline, checkout(args.baseline, tmp), env))
+        variants += [
+            ("FAST_START=0", FRONTEND, {**env, "FAST_START": "0"}),
+            ("FAST_START=1", FRONTEND, {**env, "FAST_START": "1"}),
+        ]
+        print(f"median of {args.repeat} fresh processes, backend latency {args.latency_ms:g}ms, "
+              f"{args.bookings} bookings")
+        print(f"{'variant':<14} {'script':<9} {'imports ms':>10} {'first render ms':>15} {'ready ms':>9} "
+              f"{'dashboard ms':>12}")
+        try:
+            for name, directory, variant_env in variants:
+                for script in ("app.py", "admin.py"):
+                    runs = [measure(directory, script, variant_env, args.typing) for _ in range(args.repeat)]
+                    median = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+                    print(f"{name:<14} {script:<9} {median['import']:>10.0f} {median['first_render']:>15.0f} "
+                          f"{median.get('ready', float('nan')):>9.0f} {median.get('dashboard', float('nan')):>12.0f}")
+        finally:
+            backend.stop()
+
+
+if __name__ == "__main__":
+    main()
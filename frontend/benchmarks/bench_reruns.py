@@ -0,0 +1,124 @@
+"""Benchmark: cost of scripted reruns of ``app.py`` and ``admin.py``.
+
+Drives both apps with Streamlit's ``AppTest`` against the stand-in backend
+preloaded with increasingly many bookings. The first run of each repeat
+starts with empty Streamlit caches, like a fresh server process.
+
+Run from the ``frontend`` directory:
+
+    python benchmarks/bench_reruns.py [--sizes 100,1000,10000] [--repeat 5]
+                                      [--latency-ms 0] [--breakdown]
+
+``--breakdown`` turns on ``metrics`` and prints where the time went.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+FRONTEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, FRONTEND)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--sizes", default="100,1000,10000", help="bookings preloaded per run")
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--latency-ms", type=float, default=0, help="backend latency per request")
+parser.add_argument("--breakdown", action="store_true", help="report per hot path timings")
+args = parser.parse_args()
+
+# Must be set before anything imports metrics
+if args.breakdown:
+    os.environ["METRICS_ENABLED"] = "1"
+
+from stub_backend import StubBackend, sample_bookings  # noqa: E402
+
+backend = StubBackend(latency=args.latency_ms / 1000).start()
+os.environ["API_URL"] = backend.api_url
+
+import numpy as np  # noqa: E402
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import metrics  # noqa: E402
+
+
+def widget(elements, label):
+    return next(element for element in elements if element.label.startswith(label))
+
+
+def guest_session():
+    at = AppTest.from_file(os.path.join(FRONTEND, "app.py"), default_timeout=60)
+    check_in = date.today() + timedelta(days=30)
+    yield "muat pertama", at.run
+    yield "rerun", at.run
+    yield "pilih tarikh", lambda: (
+        widget(at.date_input, "Tarikh Check-in").set_value(check_in),
+        widget(at.date_input, "Tarikh Check-out").set_value(check_in + timedelta(days=3)),
+        at.run(),
+    )
+    yield "hantar", lambda: (
+        widget(at.text_input, "Nama Penuh").input("Tetamu Penanda Aras"),
+        widget(at.text_input, "Nama Panggilan").input("Penanda"),
+        widget(at.text_input, "No. Reference").input(f"BENCH{time.time_ns()}"),
+        widget(at.button, "📤 Hantar").click(),
+        at.run(),
+    )
+    assert not at.exception, at.exception
+
+
+def admin_session():
+    at = AppTest.from_file(os.path.join(FRONTEND, "admin.py"), default_timeout=60)
+    at.session_state.authenticated = True
+    yield "muat pertama", at.run
+    yield "rerun", at.run
+    yield "halaman 2", lambda: (at.number_input(key="booking_page").set_value(2), at.run())
+    yield "tapis status", lambda: (widget(at.selectbox, "Tapis mengikut status").set_value("pending"), at.run())
+    widget(at.checkbox, "Pilih semua").check()
+    at.run()
+    yield "sahkan pukal", lambda: (widget(at.button, "Sahkan Dipilih").click(), at.run())
+    assert not at.exception, at.exception
+
+
+def run_session(session, timings, breakdown):
+    # Fresh server process: nothing cached yet
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    for step, action in session():
+        start = time.perf_counter()
+        action()
+        timings[step].append(time.perf_counter() - start)
+    if args.breakdown:
+        for h in metrics.get_registry().snapshot()["histograms"]:
+            labels = ",".join(f"{k}={v}" for k, v in h["labels"].items())
+            totals = breakdown[f"{h['name']} {labels}".strip()]
+            totals[0] += h["count"]
+            totals[1] += h["sum"]
+
+
+def main():
+    print(f"{args.repeat} repeats per size, backend latency {args.latency_ms:g}ms")
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            backend.reset()
+            backend.add_bookings(sample_bookings(size))
+            print(f"\n{size} bookings")
+            print(f"{'app':<7} {'step':<14} {'median ms':>10} {'max ms':>9}")
+            for name, session in (("app", guest_session), ("admin", admin_session)):
+                timings = defaultdict(list)
+                breakdown = defaultdict(lambda: [0, 0.0])
+                for _ in range(args.repeat):
+                    run_session(session, timings, breakdown)
+                for step, samples in timings.items():
+                    print(f"{name:<7} {step:<14} {np.median(samples) * 1000:>10.1f} {max(samples) * 1000:>9.1f}")
+                if args.breakdown:
+                    print(f"  {'hot path':<44} {'calls/session':>13} {'mean ms':>8}")
+                    for path, (count, total) in sorted(breakdown.items(), key=lambda item: -item[1][1]):
+                        print(f"  {path:<44} {count / args.repeat:>13.1f} {total / count * 1000:>8.2f}")
+    finally:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Fire many simultaneous booking submissions at the stand-in backend.
+
+Checks that concurrent and repeated submissions create exactly one booking
+per date range.
+
+The stand-in handles every request under one Python lock, so this checks
+the client side (idempotency keys, retries, duplicate handling) but never
+exercises the ``GET_LOCK`` serialisation in ``backend/server.js``. That
+needs a run against the real backend and MySQL.
+
+Run from the ``frontend`` directory:
+
+    python benchmarks/check_concurrent_submissions.py [--clients 50]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_client import ApiClient  # noqa: E402
+from stub_backend import StubBackend  # noqa: E402
+from submissions import DONE, FAILED, SubmissionQueue  # noqa: E402
+
+
+def booking(reference, check_in, check_out):
+    return {
+        "nama_penuh": f"Tetamu {reference}",
+        "nama_panggilan": reference,
+        "tarikh_check_in": check_in,
+        "tarikh_check_out": check_out,
+        "no_reference": reference,
+    }
+
+
+def fire(clients, make_call):
+    """Start ``clients`` threads that all call at the same moment; return their results."""
+    barrier = threading.Barrier(clients)
+    results = [None] * clients
+
+    def worker(i):
+        barrier.wait()
+        results[i] = make_call(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def wait_all(submissions, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not all(s.finished for s in submissions):
+        time.sleep(0.05)
+    return submissions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    args = parser.parse_args()
+
+    backend = StubBackend().start()
+    client = ApiClient(base_url=backend.api_url, pool_size=args.clients)
+    failures = []
+
+    def check(name, condition, detail):
+        print(f"{'ok' if condition else 'FAIL':>4}  {name}: {detail}")
+        if not condition:
+            failures.append(name)
+
+    # 1. Double clicks in one session collapse onto one submission
+    queue = SubmissionQueue(client, max_workers=8)
+    same = fire(args.clients, lambda i: queue.submit(booking("REF-A", "2030-01-01", "2030-01-03")))
+    wait_all(same)
+    check("one submission per key", len({id(s) for s in same}) == 1, f"{len({id(s) for s in same})} submission(s)")
+
+    # 2. The same booking from many server processes (one queue each)
+    queues = [SubmissionQueue(client, max_workers=1, backoff=0.05) for _ in range(args.clients)]
+    many = wait_all(fire(args.clients, lambda i: queues[i].submit(booking("REF-B", "2030-02-01", "2030-02-04"))))
+    created = [b for b in backend.bookings() if b['no_reference'] == "REF-B"]
+    check("duplicate keys create one booking", len(created) == 1, f"{len(created)} booking(s)")
+    check("every duplicate reports success", all(s.status == DONE for s in many),
+          f"{sum(s.status == DONE for s in many)}/{len(many)} done")
+
+    # 3. Different guests racing for the same nights
+    racing = wait_all(fire(args.clients, lambda i: SubmissionQueue(client, max_workers=1, backoff=0.05).submit(
+        booking(f"REF-C{i}", "2030-03-01", "2030-03-05"))))
+    created = [b for b in backend.bookings() if b['tarikh_check_in'] == "2030-03-01"]
+    rejected = [s for s in racing if s.status == FAILED and s.error_type == "invalid"]
+    check("one booking per date range", len(created) == 1, f"{len(created)} booking(s)")
+    check("other guests are told the dates are taken", len(rejected) == args.clients - 1,
+          f"{len(rejected)} rejected")
+
+    backend.stop()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Load test: concurrent guests and admins against the stand-in backend.
+
+Guests probe the availability revision, rebuild the shared occupancy
+calendar when it changed (as ``get_occupancy`` does once per process),
+pick a free window and submit a booking. Admins sync the booking store,
+page through the table and confirm pending bookings in bulk. Every user
+shares one ``ApiClient``, like the sessions of one Streamlit process.
+
+Run from the ``frontend`` directory:
+
+    python benchmarks/load_test.py [--guests 50] [--admins 5] [--duration 10]
+                                   [--latency-ms 5] [--sizes 100,1000,10000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from api_client import ApiClient, ApiError  # noqa: E402
+from booking_pages import PageQuery  # noqa: E402
+from booking_sync import BookingStore  # noqa: E402
+from occupancy import OccupancyCalendar  # noqa: E402
+from stub_backend import StubBackend, sample_bookings  # noqa: E402
+
+
+class Recorder:
+    """Latency samples and outcomes per operation."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.outcomes = defaultdict(lambda: defaultdict(int))
+
+    async def run(self, executor, operation, func, *args):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except ApiError as e:
+            # 4xx is a business answer (e.g. dates taken), not a failure
+            outcome = "rejected" if e.status_code < 500 else "error"
+        except Exception:
+            outcome = "error"
+        finally:
+            self.samples[operation].append(time.perf_counter() - start)
+            self.outcomes[operation][outcome] += 1
+
+    def report(self, elapsed):
+        rows = []
+        for operation, samples in sorted(self.samples.items()):
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+            outcomes = self.outcomes[operation]
+            rows.append((operation, len(samples), len(samples) / elapsed, p50, p95, p99,
+                         outcomes["rejected"], outcomes["error"]))
+        return rows
+
+
+class SharedOccupancy:
+    """The guest app's per-process occupancy cache, keyed on the revision."""
+
+    def __init__(self):
+        self.revision = None
+        self.calendar = None
+        self.lock = threading.Lock()
+
+    def get(self, client):
+        revision = client.availability_revision()
+        with self.lock:
+            if self.calendar is None or revision != self.revision:
+                self.calendar = OccupancyCalendar.build(*client.occupancy())
+                self.revision = revision
+            return self.calendar
+
+
+async def guest(i, client, executor, recorder, occupancy, deadline, think):
+    rng = random.Random(i)
+    while time.monotonic() < deadline:
+        calendar = await recorder.run(executor, "guest: availability", occupancy.get, client)
+        if calendar is not None:
+            nights = rng.randint(1, 4)
+            wanted = date.today() + timedelta(days=rng.randint(1, 180))
+            check_in = calendar.availability().next_free_window(wanted, nights)
+            reference = f"LOAD{i:04d}{rng.getrandbits(32):08X}"
+            await recorder.run(executor, "guest: submit", client.create_booking, {
+                "nama_penuh": f"Tetamu Beban {i}",
+                "nama_panggilan": f"B{i}",
+                "tarikh_check_in": check_in.isoformat(),
+                "tarikh_check_out": (check_in + timedelta(days=nights)).isoformat(),
+                "no_reference": reference,
+            })
+        await asyncio.sleep(rng.expovariate(1 / think))
+
+
+async def admin(i, client, executor, recorder, store, deadline, think):
+    rng = random.Random(-i - 1)
+    while time.monotonic() < deadline:
+        await recorder.run(executor, "admin: sync", store.sync, client)
+        query = PageQuery()
+        for _ in range(3):
+            data = await recorder.run(executor, "admin: page", client.booking_page, query.params())
+            if not data or query.page * query.page_size >= data["total"]:
+                break
+            query = query.next_page()
+        pending = await recorder.run(executor, "admin: page", client.booking_page,
+                                     PageQuery(status="pending", page_size=10).params())
+        if pending and pending["rows"]:
+            ids = [row["id"] for row in pending["rows"][:rng.randint(1, 10)]]
+            await recorder.run(executor, "admin: confirm", client.update_booking_statuses, ids, "confirmed")
+        await asyncio.sleep(rng.expovariate(1 / think))
+
+
+async def load(client, args):
+    recorder = Recorder()
+    occupancy = SharedOccupancy()
+    store = BookingStore()
+    deadline = time.monotonic() + args.duration
+    # One thread per virtual user, so waiting on the pool is what gets measured
+    with ThreadPoolExecutor(max_workers=args.guests + args.admins) as executor:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(guest(i, client, executor, recorder, occupancy, deadline, args.think) for i in range(args.guests)),
+            *(admin(i, client, executor, recorder, store, deadline, args.think) for i in range(args.admins)),
+        )
+        elapsed = time.perf_counter() - start
+    return recorder.report(elapsed), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--guests", type=int, default=50)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per dataset size")
+    parser.add_argument("--think", type=float, default=0.5, help="mean think time between actions, seconds")
+    parser.add_argument("--latency-ms", type=float, default=5, help="backend latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--sizes", default="100,1000,10000", help="bookings preloaded per run")
+    args = parser.parse_args()
+
+    backend = StubBackend(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000).start()
+    print(f"{args.guests} guests, {args.admins} admins, {args.duration:g}s per size, "
+          f"backend latency {args.latency_ms:g}+{args.jitter_ms:g}ms")
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            backend.reset()
+            backend.add_bookings(sample_bookings(size))
+            client = ApiClient(backend.api_url)
+            rows, elapsed = asyncio.run(load(client, args))
+            stats = client.stats()
+            print(f"\n{size} bookings ({elapsed:.1f}s, {stats['connections_opened']} connections opened, "
+                  f"{stats['connections_reused']} reused)")
+            print(f"{'operation':<20} {'count':>6} {'ops/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                  f"{'rejected':>8} {'errors':>6}")
+            for operation, count, rate, p50, p95, p99, rejected, errors in rows:
+                print(f"{operation:<20} {count:>6} {rate:>7.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} "
+                      f"{rejected:>8} {errors:>6}")
+    finally:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""In-process stand-in for the Express backend, backed by SQLite.
+
+Mirrors the routes in ``backend/server.js`` closely enough to exercise the
+Streamlit apps and their API client without MySQL. Usage:
+
+    backend = StubBackend()
+    backend.start()
+    os.environ["API_URL"] = backend.api_url
+    ...
+    backend.stop()
+
+``latency`` (plus up to ``jitter``) seconds are slept before every request,
+outside the database lock, to stand in for network and MySQL time.
+"""
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SCHEMA = """
+CREATE TABLE bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama_penuh TEXT,
+    nama_panggilan TEXT,
+    tarikh_check_in TEXT,
+    tarikh_check_out TEXT,
+    no_reference TEXT,
+    status TEXT DEFAULT 'pending',
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE TABLE blocked_dates (date_blocked TEXT PRIMARY KEY);
+"""
+
+SORTABLE_COLUMNS = {'id', 'nama_penuh', 'tarikh_check_in', 'tarikh_check_out', 'status', 'created_at', 'updated_at'}
+MAX_PAGE_SIZE = 200
+
+
+def iso(moment):
+    # Same shape as mysql2's JSON dates, so string comparison orders correctly
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def now():
+    return iso(datetime.now(timezone.utc))
+
+
+def sample_bookings(count, seed=0, today=None):
+    """Synthetic bookings spread over a year either side of ``today``.
+
+    Audit timestamps are always in the past, so ``updated_since`` deltas
+    pick up later changes.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    started = datetime.now(timezone.utc)
+    bookings = []
+    for i in range(count):
+        check_in = today + timedelta(days=rng.randint(-365, 365))
+        created = datetime.combine(check_in, datetime.min.time(), timezone.utc) - timedelta(days=rng.randint(1, 90))
+        # Future stays were booked at most a day ago
+        created = min(created, started - timedelta(seconds=rng.randint(1, 86400)))
+        bookings.append({
+            'nama_penuh': f"Tetamu Nombor {i}",
+            'nama_panggilan': f"T{i}",
+            'tarikh_check_in': check_in.isoformat(),
+            'tarikh_check_out': (check_in + timedelta(days=rng.randint(1, 6))).isoformat(),
+            'no_reference': f"REF{i:08d}",
+            'status': rng.choice(['pending', 'confirmed', 'cancelled']),
+            'created_at': iso(created),
+            'updated_at': iso(created),
+        })
+    return bookings
+
+
+class StubBackend:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        # One lock for the whole database, like the named lock around booking creation
+        self.lock = threading.Lock()
+        self.latency = latency
+        self.jitter = jitter
+        self.server = ThreadingHTTPServer((host, port), _handler(self))
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def api_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    # Data helpers
+
+    def reset(self):
+        with self.lock:
+            self.db.execute("DELETE FROM bookings")
+            self.db.execute("DELETE FROM blocked_dates")
+
+    def add_blocked_dates(self, dates):
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO blocked_dates VALUES (?)", [(d,) for d in dates]
+            )
+
+    def add_bookings(self, bookings):
+        stamp = now()
+        rows = [
+            (
+                b['nama_penuh'], b['nama_panggilan'], b['tarikh_check_in'], b['tarikh_check_out'],
+                b['no_reference'], b.get('status', 'pending'), b.get('created_at', stamp), b.get('updated_at', stamp),
+            )
+            for b in bookings
+        ]
+        with self.lock:
+            self.db.executemany(
+                "INSERT INTO bookings (nama_penuh, nama_panggilan, tarikh_check_in, tarikh_check_out,"
+                " no_reference, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def bookings(self):
+        with self.lock:
+            return [dict(row) for row in self.db.execute("SELECT * FROM bookings ORDER BY id")]
+
+    # Routes
+
+    def list_bookings(self, query):
+        if 'page' in query:
+            return 200, self._booking_page(query)
+        if 'updated_since' in query:
+            since = iso(datetime.fromisoformat(query['updated_since'].replace('Z', '+00:00')))
+            rows = self.db.execute(
+                "SELECT * FROM bookings WHERE updated_at >= ? ORDER BY created_at DESC", (since,)
+            )
+        else:
+            rows = self.db.execute("SELECT * FROM bookings ORDER BY created_at DESC")
+        return 200, [dict(row) for row in rows]
+
+    def _booking_page(self, query):
+        clauses, params = [], []
+        if query.get('status'):
+            clauses.append("status = ?")
+            params.append(query['status'])
+        if query.get('from'):
+            clauses.append("tarikh_check_out > ?")
+            params.append(query['from'])
+        if query.get('to'):
+            clauses.append("tarikh_check_in <= ?")
+            params.append(query['to'])
+        if query.get('q'):
+            like = f"%{query['q']}%"
+            clauses.append("(nama_penuh LIKE ? OR nama_panggilan LIKE ? OR no_reference LIKE ? OR CAST(id AS TEXT) = ?)")
+            params += [like, like, like, query['q']]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        page = max(int(query.get('page') or 1), 1)
+        page_size = min(max(int(query.get('page_size') or 25), 1), MAX_PAGE_SIZE)
+        sort = query.get('sort') if query.get('sort') in SORTABLE_COLUMNS else 'created_at'
+        order = 'ASC' if query.get('order') == 'asc' else 'DESC'
+
+        total = self.db.execute(f"SELECT COUNT(*) FROM bookings {where}", params).fetchone()[0]
+        rows = self.db.execute(
+            f"SELECT * FROM bookings {where} ORDER BY {sort} {order}, id {order} LIMIT ? OFFSET ?",
+            params + [page_size, (page - 1) * page_size],
+        )
+        return {"rows": [dict(row) for row in rows], "total": total, "page": page, "page_size": page_size}
+
+    def create_booking(self, body):
+        check_in, check_out, reference = body['tarikh_check_in'], body['tarikh_check_out'], body['no_reference']
+        if not check_out > check_in:
+            return 400, {"error": "Tarikh Check-out mesti selepas tarikh Check-in"}
+        existing = self.db.execute(
+            "SELECT id FROM bookings WHERE no_reference = ? AND tarikh_check_in = ? AND tarikh_check_out = ?"
+            " AND status <> 'cancelled' LIMIT 1",
+            (reference, check_in, check_out),
+        ).fetchone()
+        if existing:
+            return 200, {"message": "Tempahan telah diterima", "bookingId": existing['id'], "duplicate": True}
+
+        blocked = self.db.execute(
+            "SELECT 1 FROM blocked_dates WHERE date_blocked >= ? AND date_blocked < ? LIMIT 1", (check_in, check_out)
+        ).fetchone()
+        overlapping = self.db.execute(
+            "SELECT 1 FROM bookings WHERE status IN ('pending', 'confirmed')"
+            " AND tarikh_check_in < ? AND tarikh_check_out > ? LIMIT 1",
+            (check_out, check_in),
+        ).fetchone()
+        if blocked or overlapping:
+            return 400, {"error": "Tarikh yang dipilih telah ditempah"}
+
+        stamp = now()
+        cursor = self.db.execute(
+            "INSERT INTO bookings (nama_penuh, nama_panggilan, tarikh_check_in, tarikh_check_out, no_reference,"
+            " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (body['nama_penuh'], body['nama_panggilan'], check_in, check_out, reference, stamp, stamp),
+        )
+        return 201, {"message": "Tempahan berjaya dibuat", "bookingId": cursor.lastrowid}
+
+    def set_status(self, booking_id, status):
+        self.db.execute("UPDATE bookings SET status = ?, updated_at = ? WHERE id = ?", (status, now(), booking_id))
+
+    def set_statuses(self, booking_ids, status):
+        placeholders = ", ".join("?" * len(booking_ids))
+        found = {row[0] for row in self.db.execute(f"SELECT id FROM bookings WHERE id IN ({placeholders})", booking_ids)}
+        self.db.executemany("UPDATE bookings SET status = ?, updated_at = ? WHERE id = ?",
+                            [(status, now(), booking_id) for booking_id in found])
+        return 200, {"results": [
+            {"id": booking_id, "ok": True} if booking_id in found
+            else {"id": booking_id, "ok": False, "error": "Tempahan tidak dijumpai"}
+            for booking_id in booking_ids
+        ]}
+
+    def blocked_dates(self):
+        return [row[0] for row in self.db.execute("SELECT date_blocked FROM blocked_dates")]
+
+    def occupancy(self):
+        rows = self.db.execute(
+            "SELECT id, tarikh_check_in AS check_in, tarikh_check_out AS check_out, status FROM bookings"
+            " WHERE status IN ('pending', 'confirmed') AND tarikh_check_out > date('now')"
+            " AND tarikh_check_out > tarikh_check_in"
+        )
+        return {"blockedDates": self.blocked_dates(), "bookings": [dict(row) for row in rows]}
+
+    def availability_ics(self):
+        nights = set(self.blocked_dates())
+        for check_in, check_out in self.db.execute(
+            "SELECT tarikh_check_in, tarikh_check_out FROM bookings WHERE status = 'confirmed'"
+        ):
+            day = date.fromisoformat(check_in)
+            while day < date.fromisoformat(check_out):
+                nights.add(day.isoformat())
+                day += timedelta(days=1)
+
+        runs = []
+        for night in sorted(date.fromisoformat(n) for n in nights):
+            if runs and runs[-1][1] == night:
+                runs[-1][1] = night + timedelta(days=1)
+            else:
+                runs.append([night, night + timedelta(days=1)])
+        events = [
+            f"BEGIN:VEVENT\r\nUID:{start:%Y%m%d}-{end:%Y%m%d}@dekinta-homestay\r\n"
+            f"DTSTART;VALUE=DATE:{start:%Y%m%d}\r\nDTEND;VALUE=DATE:{end:%Y%m%d}\r\n"
+            "SUMMARY:Tidak tersedia\r\nEND:VEVENT"
+            for start, end in runs
+        ]
+        return "\r\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", *events, "END:VCALENDAR", ""])
+
+    def revision(self):
+        row = self.db.execute(
+            "SELECT (SELECT COUNT(*) FROM blocked_dates), (SELECT group_concat(date_blocked) FROM blocked_dates),"
+            " (SELECT COUNT(*) FROM bookings),"
+            " (SELECT group_concat(id || ':' || status || ':' || tarikh_check_in || ':' || tarikh_check_out)"
+            "  FROM (SELECT * FROM bookings ORDER BY id))"
+        ).fetchone()
+        return hashlib.sha1(repr(tuple(row)).encode()).hexdigest()[:16]
+
+
+def _handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, data=None, headers=None):
+            body = b"" if data is None else json.dumps(data).encode()
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if data is not None:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _route(self, method):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            path = url.path
+            body = self._body() if method in ("POST", "PUT") else None
+            booking = re.fullmatch(r"/api/bookings/(\d+)", path)
+
+            backend.delay()
+            with backend.lock:
+                if method == "GET" and path == "/api/bookings":
+                    return self._send(*backend.list_bookings(query))
+                if method == "POST" and path == "/api/bookings":
+                    return self._send(*backend.create_booking(body))
+                if method == "POST" and path == "/api/bookings/batch":
+                    return self._send(*backend.set_statuses(body['ids'], body['status']))
+                if method == "PUT" and booking:
+                    backend.set_status(int(booking[1]), body['status'])
+                    return self._send(200, {"message": "Status tempahan dikemaskini"})
+                if method == "DELETE" and booking:
+                    backend.set_status(int(booking[1]), 'cancelled')
+                    return self._send(200, {"message": "Tempahan dibatalkan"})
+                if method == "GET" and path == "/api/blocked-dates":
+                    return self._send(200, backend.blocked_dates())
+                if method == "GET" and path == "/api/occupancy":
+                    return self._send(200, backend.occupancy())
+                if method == "GET" and path == "/api/availability.ics":
+                    body = backend.availability_ics().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/calendar")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    return self.wfile.write(body)
+                if method == "GET" and path == "/api/availability/revision":
+                    etag = f'"{backend.revision()}"'
+                    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+                    if self.headers.get("If-None-Match") == etag:
+                        return self._send(304, headers=headers)
+                    return self._send(200, {"revision": etag.strip('"')}, headers)
+            self._send(404, {"error": "Tidak dijumpai"})
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_POST(self):
+            self._route("POST")
+
+        def do_PUT(self):
+            self._route("PUT")
+
+        def do_DELETE(self):
+            self._route("DELETE")
+
+    return Handler
@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+import streamlit as st
+
+from api_client import get_client
+from booking_sync import to_frame
+
+PAGE_SIZES = [25, 50, 100]
+SORT_COLUMNS = {
+    "created_at": "Tarikh Dibuat",
+    "tarikh_check_in": "Tarikh Check-in",
+    "tarikh_check_out": "Tarikh Check-out",
+    "nama_penuh": "Nama Penuh",
+    "status": "Status",
+}
+
+
+@dataclass(frozen=True)
+class PageQuery:
+    status: str = None
+    date_from: str = None
+    date_to: str = None
+    q: str = None
+    sort: str = "created_at"
+    order: str = "desc"
+    page_size: int = PAGE_SIZES[0]
+    page: int = 1
+
+    def params(self):
+        params = {
+            "status": self.status,
+            "from": self.date_from,
+            "to": self.date_to,
+            "q": self.q,
+            "sort": self.sort,
+            "order": self.order,
+            "page_size": self.page_size,
+            "page": self.page,
+        }
+        return {key: value for key, value in params.items() if value is not None}
+
+    def at_page(self, page):
+        return replace(self, page=page)
+
+    def next_page(self):
+        return self.at_page(self.page + 1)
+
+
+class BookingPage:
+    def __init__(self, query, data):
+        self.query = query
+        self.df = to_frame(data["rows"])
+        self.total = data["total"]
+        self.page_count = max(-(-self.total // query.page_size), 1)
+
+    @property
+    def has_next(self):
+        return self.query.page < self.page_count
+
+
+class PagePrefetcher:
+    """Fetches booking pages on a small thread pool and keeps recent ones.
+
+    Pages are keyed by query and the booking store revision, so a sync
+    that changes data makes every cached page stale at once.
+    """
+
+    def __init__(self, client, max_workers=2, max_pages=32):
+        self.client = client
+        self.max_pages = max_pages
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="booking-pages")
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _submit(self, query, revision):
+        key = (query, revision)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._executor.submit(self._fetch, query)
+                self._futures[key] = future
+                while len(self._futures) > self.max_pages:
+                    self._futures.popitem(last=False)
+            else:
+                self._futures.move_to_end(key)
+            return future
+
+    def _fetch(self, query):
+        return BookingPage(query, self.client.booking_page(query.params()))
+
+    def get(self, query, revision):
+        future = self._submit(query, revision)
+        try:
+            page = future.result()
+        except Exception:
+            # Don't keep failures around; the next rerun should try again
+            with self._lock:
+                if self._futures.get((query, revision)) is future:
+                    del self._futures[(query, revision)]
+            raise
+        if page.has_next:
+            self.prefetch(query.next_page(), revision)
+        return page
+
+    def prefetch(self, query, revision):
+        self._submit(query, revision)
+
+
+@st.cache_resource
+def get_prefetcher():
+    return PagePrefetcher(get_client())
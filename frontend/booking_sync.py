@@ -0,0 +1,113 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from metrics import instrument
+
+BOOKING_COLUMNS = [
+    'id', 'nama_penuh', 'nama_panggilan', 'tarikh_check_in', 'tarikh_check_out',
+    'no_reference', 'status', 'created_at', 'updated_at',
+]
+
+# Column types of the booking frame
+STATUS_DTYPE = pd.CategoricalDtype(['pending', 'confirmed', 'cancelled'])
+STRING_DTYPE = pd.StringDtype("pyarrow")
+TEXT_COLUMNS = ['nama_penuh', 'nama_panggilan', 'no_reference']
+DATE_COLUMNS = ['tarikh_check_in', 'tarikh_check_out']
+TIMESTAMP_COLUMNS = ['created_at', 'updated_at']
+
+
+def parse_timestamps(values):
+    """UTC timestamps from API strings.
+
+    mysql2 serialises timestamps as ``YYYY-MM-DDTHH:MM:SS.mmmZ``; when every
+    value has exactly that shape NumPy parses them several times faster
+    than ``pd.to_datetime``. Anything else takes the general path.
+    """
+    text = np.asarray(values, dtype="U24")
+    if len(text) and (text.view(np.uint32).reshape(-1, 24)[:, 23] == ord("Z")).all():
+        return pd.DatetimeIndex(text.astype("U23").astype("datetime64[ns]")).tz_localize("UTC")
+    return pd.to_datetime(values, utc=True, format="ISO8601")
+
+
+@instrument("dataframe_build_seconds", frame="bookings")
+def to_frame(bookings):
+    """Typed booking frame indexed by id.
+
+    Names and references are Arrow-backed strings, ``status`` is a
+    categorical, stay dates are ``datetime64`` days and the audit
+    timestamps are UTC.
+    """
+    df = pd.DataFrame(bookings, columns=BOOKING_COLUMNS)
+    df = df.astype({'id': 'int64', 'status': STATUS_DTYPE, **{col: STRING_DTYPE for col in TEXT_COLUMNS}})
+    for col in DATE_COLUMNS:
+        df[col] = pd.to_datetime(df[col].str.slice(0, 10), format='%Y-%m-%d')
+    for col in TIMESTAMP_COLUMNS:
+        df[col] = parse_timestamps(df[col])
+    return df.set_index('id')
+
+
+class BookingStore:
+    """Booking list kept in memory and refreshed with ``updated_since`` deltas.
+
+    ``df`` is replaced, never mutated, so readers can keep a reference
+    to the frame they got while another session syncs.
+    """
+
+    def __init__(self):
+        self.df = None
+        self.last_seen = None
+        self.revision = 0
+        self._lock = threading.Lock()
+
+    @instrument("booking_sync_seconds")
+    def sync(self, client, full=False):
+        """Refresh from the API; returns ``(df, revision)`` as of this sync."""
+        with self._lock:
+            if full or self.df is None or self.last_seen is None:
+                self._replace(to_frame(client.bookings()))
+            else:
+                delta = to_frame(client.bookings(updated_since=self.last_seen.isoformat()))
+                self._merge(delta)
+            return self.df, self.revision
+
+    def snapshot(self):
+        """Current ``(df, revision)``, read together."""
+        with self._lock:
+            return self.df, self.revision
+
+    def apply_status(self, booking_ids, status):
+        """Optimistically set ``status`` locally; the next sync brings the server's rows."""
+        with self._lock:
+            if self.df is None:
+                return
+            df = self.df.copy()
+            df.loc[df.index.intersection(booking_ids), 'status'] = status
+            self.df = df
+            self.revision += 1
+
+    def _replace(self, df):
+        self.df = df.sort_values('created_at', ascending=False)
+        # NaT (no rows, or none with updated_at) means the next sync reloads in full
+        last_seen = df['updated_at'].max()
+        self.last_seen = None if pd.isna(last_seen) else last_seen
+        self.revision += 1
+
+    def _merge(self, delta):
+        if delta.empty:
+            return
+        # The server returns rows with updated_at >= last_seen, so the newest
+        # row we already have comes back every time; skip unchanged deltas
+        known = delta.index.isin(self.df.index)
+        if known.all() and delta.equals(self.df.loc[delta.index, delta.columns]):
+            return
+        merged = pd.concat([self.df.drop(delta.index[known]), delta])
+        self._replace(merged)
+
+
+@st.cache_resource
+def get_booking_store():
+    # Shared by every admin session in this server process
+    return BookingStore()
@@ -0,0 +1,77 @@
+import io
+import tempfile
+from dataclasses import replace
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from booking_pages import PageQuery
+from booking_sync import DATE_COLUMNS, to_frame
+
+EXPORT_PAGE_SIZE = 200
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def iter_booking_pages(client, query=None, page_size=EXPORT_PAGE_SIZE):
+    """Yield typed booking frames one API page at a time, oldest first.
+
+    Paging by ascending id keeps pages stable while new bookings arrive.
+    When nothing matches, one empty frame is yielded so writers still
+    produce a header or schema.
+    """
+    query = replace(query or PageQuery(), sort="id", order="asc", page_size=page_size, page=1)
+    while True:
+        data = client.booking_page(query.params())
+        if data["rows"] or query.page == 1:
+            yield to_frame(data["rows"])
+        if query.page * page_size >= data["total"] or not data["rows"]:
+            return
+        query = query.next_page()
+
+
+def write_csv(pages, fileobj):
+    rows = 0
+    for i, df in enumerate(pages):
+        df = df.assign(**{col: df[col].dt.strftime("%Y-%m-%d") for col in DATE_COLUMNS})
+        df.to_csv(fileobj, header=i == 0, date_format="%Y-%m-%d %H:%M:%S")
+        rows += len(df)
+    return rows
+
+
+def write_parquet(pages, fileobj):
+    rows = 0
+    writer = None
+    try:
+        for df in pages:
+            table = pa.Table.from_pandas(df, schema=writer.schema if writer else None, preserve_index=True)
+            if writer is None:
+                writer = pq.ParquetWriter(fileobj, table.schema)
+            writer.write_table(table)
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export_bookings(client, fmt, query=None):
+    """Stream bookings matching ``query`` into a temporary file; return ``(file, rows)``.
+
+    Only one page is held in memory at a time. The caller owns the
+    returned file, which is positioned at the start.
+    """
+    fileobj = tempfile.TemporaryFile()
+    pages = iter_booking_pages(client, query)
+    if fmt == "csv":
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+        rows = write_csv(pages, text)
+        text.flush()
+        text.detach()
+    else:
+        rows = write_parquet(pages, fileobj)
+    fileobj.seek(0)
+    return fileobj, rows
@@ -0,0 +1,242 @@
+"""Lightweight timing and counting for the Streamlit hot paths.
+
+Off unless ``METRICS_ENABLED=1``; when off, ``timed`` and ``count`` return
+immediately and ``instrument`` leaves functions undecorated. Numbers are
+aggregated per server process. Set ``METRICS_DIR`` to have each app
+process write a JSON snapshot there so the admin performance page can
+show the guest app too.
+"""
+import bisect
+import functools
+import glob
+import heapq
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+ENABLED = os.environ.get("METRICS_ENABLED", "0") == "1"
+METRICS_DIR = os.environ.get("METRICS_DIR")
+FLUSH_INTERVAL = 5
+
+# Histogram buckets in seconds, Prometheus style
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Recent samples kept per histogram for percentiles
+RESERVOIR_SIZE = 1024
+SLOWEST_RERUNS = 10
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def percentiles(self):
+        values = sorted(self.recent)
+        if not values:
+            return {"p50": None, "p95": None, "p99": None}
+        pick = lambda q: values[min(int(q * len(values)), len(values) - 1)]  # noqa: E731
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.slow_reruns = []
+        self._lock = threading.Lock()
+        self._flushed = 0.0
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def record_rerun(self, script, seconds):
+        self.observe("rerun_seconds", seconds, script=script)
+        with self._lock:
+            entry = (seconds, time.time(), script)
+            if len(self.slow_reruns) < SLOWEST_RERUNS:
+                heapq.heappush(self.slow_reruns, entry)
+            else:
+                heapq.heappushpop(self.slow_reruns, entry)
+        self._maybe_flush(script)
+
+    # Export
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "time": time.time(),
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": h.count,
+                        "sum": h.sum,
+                        "buckets": list(h.buckets),
+                        **h.percentiles(),
+                    }
+                    for (name, labels), h in self.histograms.items()
+                ],
+                "slow_reruns": [
+                    {"seconds": seconds, "time": at, "script": script}
+                    for seconds, at, script in sorted(self.slow_reruns, reverse=True)
+                ],
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        return to_prometheus([self.snapshot()])
+
+    def _maybe_flush(self, script):
+        if not METRICS_DIR or time.time() - self._flushed < FLUSH_INTERVAL:
+            return
+        self._flushed = time.time()
+        path = os.path.join(METRICS_DIR, f"{script}-{os.getpid()}.json")
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f"{path}.tmp", path)
+
+
+def _prometheus_labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+def to_prometheus(snapshots):
+    """Prometheus text exposition for one or more snapshots (one per process)."""
+    # Samples of a metric family must be contiguous, so group across snapshots first
+    families = {}
+    for snapshot in snapshots:
+        pid = str(snapshot["pid"])
+        for counter in snapshot["counters"]:
+            lines = families.setdefault(counter["name"], ("counter", []))[1]
+            lines.append(f"{counter['name']}{_prometheus_labels(counter['labels'], pid=pid)} {counter['value']}")
+        for h in snapshot["histograms"]:
+            name = h["name"]
+            lines = families.setdefault(name, ("histogram", []))[1]
+            cumulative = 0
+            for bound, bucket in zip(list(BUCKETS) + ["+Inf"], h["buckets"]):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{_prometheus_labels(h['labels'], pid=pid, le=str(bound))} {cumulative}")
+            lines.append(f"{name}_sum{_prometheus_labels(h['labels'], pid=pid)} {h['sum']}")
+            lines.append(f"{name}_count{_prometheus_labels(h['labels'], pid=pid)} {h['count']}")
+    output = []
+    for name, (kind, lines) in families.items():
+        output.append(f"# TYPE {name} {kind}")
+        output.extend(lines)
+    return "\n".join(output) + "\n"
+
+
+def load_snapshots():
+    """Snapshots written by other app processes to ``METRICS_DIR``."""
+    snapshots = []
+    for path in glob.glob(os.path.join(METRICS_DIR or "", "*.json")) if METRICS_DIR else []:
+        try:
+            with open(path) as f:
+                snapshots.append({"source": os.path.basename(path)[:-5], **json.load(f)})
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+@st.cache_resource(show_spinner=False)
+def get_registry():
+    # One registry per server process
+    return Registry()
+
+
+# Helpers for instrumented code
+
+
+@contextmanager
+def timed(name, registry=None, **labels):
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        (registry or get_registry()).observe(name, time.perf_counter() - start, **labels)
+
+
+def count(name, value=1, registry=None, **labels):
+    if ENABLED:
+        (registry or get_registry()).inc(name, value, **labels)
+
+
+def instrument(name, **labels):
+    """Decorator timing every call; a no-op when metrics are disabled."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RerunTimer:
+    def __init__(self, script):
+        self.script = script
+        self.start = time.perf_counter()
+
+    def finish(self):
+        # Records once; later calls (e.g. from a fragment's own reruns) are no-ops
+        if self.start is None:
+            return
+        get_registry().record_rerun(self.script, time.perf_counter() - self.start)
+        self.start = None
+
+
+class _NoTimer:
+    def finish(self):
+        pass
+
+
+def start_rerun(script):
+    """Call at the top of a script and ``.finish()`` at the bottom.
+
+    ``st.rerun()`` ends the script early, so call ``.finish()`` before it too.
+    """
+    return RerunTimer(script) if ENABLED else _NoTimer()
@@ -0,0 +1,104 @@
+import threading
+from datetime import date
+
+import numpy as np
+
+from availability import Availability, parse_dates, parse_days, to_day
+
+# Rolling window covered by the calendar, starting today
+HORIZON_DAYS = 730
+
+# Bookings in these states hold their nights
+HOLDING_STATUSES = ("pending", "confirmed")
+
+# Per-day states, in increasing precedence
+FREE, PENDING, CONFIRMED, BLOCKED = 0, 1, 2, 3
+
+
+def _coverage(starts, ends, days):
+    """Number of ``[start, end)`` intervals covering each day, via a difference array."""
+    starts = np.clip(starts, 0, days)
+    ends = np.clip(ends, 0, days)
+    # A reversed interval would cancel out other bookings' nights; treat it as empty
+    ends = np.maximum(ends, starts)
+    diff = np.bincount(starts, minlength=days + 1) - np.bincount(ends, minlength=days + 1)
+    return np.cumsum(diff[:days]).astype(np.int32)
+
+
+class OccupancyCalendar:
+    """Per-night occupancy for ``HORIZON_DAYS`` nights from ``start``.
+
+    Blocked dates are a boolean mask; bookings are counted per status.
+    ``booking_ids`` records which bookings are counted, so a booking made in
+    this process can be added in place without counting it twice.
+    """
+
+    def __init__(self, start, days=HORIZON_DAYS):
+        self.start = start
+        self.days = days
+        self.blocked = np.zeros(days, dtype=bool)
+        self.counts = {status: np.zeros(days, dtype=np.int32) for status in HOLDING_STATUSES}
+        self.booking_ids = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, blocked_dates, bookings, start=None, days=HORIZON_DAYS):
+        calendar = cls(start or date.today(), days)
+        origin = to_day(calendar.start)
+
+        offsets = parse_dates(blocked_dates) - origin
+        calendar.blocked[offsets[(offsets >= 0) & (offsets < days)]] = True
+
+        if bookings:
+            calendar.booking_ids = {b['id'] for b in bookings}
+            status = np.array([b['status'] for b in bookings])
+            check_in = parse_days([b['check_in'] for b in bookings]) - origin
+            check_out = parse_days([b['check_out'] for b in bookings]) - origin
+            for name, counts in calendar.counts.items():
+                held = status == name
+                counts[:] = _coverage(check_in[held], check_out[held], days)
+        return calendar
+
+    def is_stale(self):
+        return self.start != date.today()
+
+    def _slice(self, check_in, check_out):
+        origin = to_day(self.start)
+        lo = min(max(to_day(check_in) - origin, 0), self.days)
+        hi = min(max(to_day(check_out) - origin, 0), self.days)
+        return slice(lo, hi)
+
+    def add_booking(self, booking_id, check_in, check_out, status="pending"):
+        """Hold a new booking's nights; a no-op if the booking is already counted."""
+        if status in self.counts:
+            with self._lock:
+                if booking_id in self.booking_ids:
+                    return
+                self.booking_ids.add(booking_id)
+                self.counts[status][self._slice(check_in, check_out)] += 1
+
+    # Queries
+
+    def states(self):
+        with self._lock:
+            return np.select(
+                [self.blocked, self.counts["confirmed"] > 0, self.counts["pending"] > 0],
+                [BLOCKED, CONFIRMED, PENDING],
+                FREE,
+            ).astype(np.int8)
+
+    def month_states(self, year, month):
+        """States for every day of a month; days outside the horizon are ``None``."""
+        first = date(year, month, 1)
+        last = date(year + month // 12, month % 12 + 1, 1)
+        nights = self._slice(first, last)
+        states = self.states()[nights]
+        lead = max(to_day(self.start) - to_day(first), 0)
+        result = [None] * (to_day(last) - to_day(first))
+        result[lead:lead + len(states)] = states.tolist()
+        return result
+
+    def availability(self):
+        occupied = np.flatnonzero(self.states() != FREE)
+        return Availability(occupied + to_day(self.start))
+
@@ -0,0 +1,124 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import requests
+import streamlit as st
+
+from api_client import ApiError, get_client
+
+QUEUED, SENDING, DONE, FAILED = "queued", "sending", "done", "failed"
+
+MAX_ATTEMPTS = 4
+BACKOFF = 0.5
+MAX_BACKOFF = 8
+# Finished submissions are forgotten after this many seconds
+KEEP_FINISHED = 15 * 60
+
+
+def idempotency_key(booking_data):
+    """Key for one booking: the payment reference and the stay dates.
+
+    The backend treats the same reference and dates as the same booking,
+    so the key collapses double clicks and retries the same way.
+    """
+    parts = [
+        booking_data["no_reference"].strip().upper(),
+        booking_data["tarikh_check_in"],
+        booking_data["tarikh_check_out"],
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+
+
+@dataclass
+class Submission:
+    key: str
+    booking_data: dict
+    status: str = QUEUED
+    attempts: int = 0
+    result: dict = None
+    error: str = None
+    # "invalid" (rejected by the API), "server", "timeout" or "connection"
+    error_type: str = None
+    finished_at: float = None
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+
+class SubmissionQueue:
+    """Posts bookings on background threads, one in-flight submission per key.
+
+    POSTs are retried with exponential backoff on timeouts, connection
+    errors and 5xx responses; the backend de-duplicates on reference and
+    dates, so a retry of a request that did land returns the same booking.
+    """
+
+    def __init__(self, client, max_workers=4, max_attempts=MAX_ATTEMPTS, backoff=BACKOFF, max_backoff=MAX_BACKOFF):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="booking-submit")
+        self._submissions = {}
+        self._lock = threading.Lock()
+
+    def submit(self, booking_data):
+        key = idempotency_key(booking_data)
+        with self._lock:
+            self._prune()
+            submission = self._submissions.get(key)
+            if submission is not None and submission.status != FAILED:
+                return submission
+            submission = Submission(key, booking_data)
+            self._submissions[key] = submission
+        self._executor.submit(self._run, submission)
+        return submission
+
+    def get(self, key):
+        with self._lock:
+            return self._submissions.get(key)
+
+    def _prune(self):
+        cutoff = time.time() - KEEP_FINISHED
+        for key, submission in list(self._submissions.items()):
+            if submission.finished and submission.finished_at < cutoff:
+                del self._submissions[key]
+
+    def _run(self, submission):
+        for attempt in range(1, self.max_attempts + 1):
+            submission.attempts = attempt
+            submission.status = SENDING
+            try:
+                submission.result = self.client.create_booking(submission.booking_data)
+                self._finish(submission, DONE)
+                return
+            except ApiError as e:
+                submission.error = e.message
+                submission.error_type = "server" if e.status_code >= 500 else "invalid"
+                if e.status_code < 500:
+                    break
+            except requests.Timeout:
+                submission.error, submission.error_type = "Masa tamat", "timeout"
+            except requests.ConnectionError:
+                submission.error, submission.error_type = "Tidak dapat menyambung ke server", "connection"
+            except Exception as e:
+                submission.error, submission.error_type = str(e), "server"
+                break
+            if attempt < self.max_attempts:
+                time.sleep(min(self.backoff * 2 ** (attempt - 1), self.max_backoff))
+        self._finish(submission, FAILED)
+
+    @staticmethod
+    def _finish(submission, status):
+        submission.finished_at = time.time()
+        submission.status = status
+
+
+@st.cache_resource
+def get_submission_queue():
+    return SubmissionQueue(get_client())
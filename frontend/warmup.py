@@ -0,0 +1,43 @@
+"""Background warm-up of per-process state, so first paint does not wait on it.
+
+On by default; ``FAST_START=0`` loads everything synchronously on first
+use instead.
+"""
+import os
+import threading
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+FAST_START = os.environ.get("FAST_START", "1") == "1"
+
+
+class Warmup:
+    """Runs ``load`` once on a daemon thread; ``ready`` is set when it ends, even on error.
+
+    The thread borrows the starting session's script context so the
+    Streamlit caches it fills work as they do on the script thread. Cached
+    functions it calls should use ``show_spinner=False``; otherwise their
+    spinner would be drawn into that session's page.
+    """
+
+    def __init__(self, name, load):
+        self.ready = threading.Event()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(load,), name=f"warmup-{name}", daemon=True)
+        add_script_run_ctx(self._thread, get_script_run_ctx())
+        self._thread.start()
+
+    def _run(self, load):
+        try:
+            load()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+
+
+@st.cache_resource(show_spinner=False)
+def warm_up(name, _load):
+    # Keyed on ``name`` only: the first session of a process starts it, later ones reuse it
+    return Warmup(name, _load)